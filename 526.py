@@ -2,7 +2,9 @@
 # Q-learning is a model free reinforcement learning algorithm to learn the value of an action in a particular state.
 
 import numpy as np
-import itertools
+
+from best_response import best_response_routing
+from csr_graph import CSRGraph
 
 # Helper function to add congestion delay
 def congestion_delay(vehicles):
@@ -46,6 +48,7 @@ class Edge:
 # Vehicle class to store vehicle data
 class Vehicle:
     def __init__(self, start, destination):
+        self.start = start
         self.current = start
         self.destination = destination
         self.travel_time = 0
@@ -81,33 +84,34 @@ class QLearningTrafficControl:
         self.graph = graph
         self.vehicles = vehicles
         self.q_table = dict()
+        self.routes = []  # Coordinated path of each vehicle after learn().
+        self.times = []
+
+    def csr_graph(self):
+        # The same network as a CSRGraph, with this model's edge times: 3 into an
+        # intersection, 1 otherwise.
+        csr = CSRGraph()
+        for node in self.graph.neighbors:
+            csr.add_node(node, node in self.graph.intersections)
+        for frm, to in self.graph.edges:
+            csr.add_edge(frm, to)
+        csr.build()
+        free_flow = np.where(csr.is_intersection[csr.targets], 3.0, 1.0)
+        return csr, free_flow
 
     def learn(self, episodes=1000):
-        for _ in range(episodes):
-            # Reset the positions of the vehicles and travel times
-            for vehicle in self.vehicles:
-                vehicle.current = vehicle.start
-                vehicle.travel_time = 0
-
-            all_paths = []
-            for vehicle in self.vehicles:
-                paths = self.get_possible_paths(vehicle)
-                all_paths.append(paths)
-
-            # Evaluate all possible combinations of paths for vehicles
-            for path_combination in itertools.product(*all_paths):
-                self.evaluate_path_combination(path_combination)
-
-    def get_possible_paths(self, vehicle):
-        # Returns all possible paths for a given vehicle
-        # This is a placeholder for the actual path finding logic
-        # Should return a list of paths where each path is a list of nodes
-        return []
-
-    def evaluate_path_combination(self, path_combination):
-        # This method evaluates a given combination of paths for all vehicles and updates the Q-table
-        # This is a placeholder for the actual evaluation logic
-        pass
+        # Coordinate all vehicles by best-response rounds: each vehicle in turn takes its
+        # fastest path given the routes the others have committed to, until nobody can
+        # improve (an equilibrium) or `episodes` rounds have passed. Each round is one
+        # shortest-path search per vehicle instead of every combination of paths.
+        for vehicle in self.vehicles:
+            vehicle.current = vehicle.start
+            vehicle.travel_time = 0
+        csr, free_flow = self.csr_graph()
+        trips = [(vehicle.start, vehicle.destination) for vehicle in self.vehicles]
+        result = best_response_routing(csr, trips, free_flow, max_rounds=episodes)
+        self.routes, self.times = result.routes, result.times
+        return result
 
 # Instantiating graph and vehicles for testing
 def main():
@@ -128,6 +132,9 @@ def main():
     # Initialize the Q-learning traffic control
     traffic_control = QLearningTrafficControl(graph, vehicles)
     # Run learning algorithm
-    traffic_control.learn()
+    result = traffic_control.learn()
+    for vehicle, route, time in zip(vehicles, traffic_control.routes, traffic_control.times):
+        print(f"Vehicle from {vehicle.start} to {vehicle.destination}: path {route}, time {time:.2f}")
+    print(f"Equilibrium after {result.rounds} rounds, total time taken for all vehicles: {result.total_time:.2f}")
 
 main()  # Run
\ No newline at end of file
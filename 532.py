@@ -4,6 +4,8 @@
 import numpy as np
 import random
 
+from convergence import ConvergenceMonitor
+
 # Defining classes
 class Node:
     def __init__(self, node_id, is_intersection):
@@ -80,7 +82,9 @@ def find_best_path(graph, start_node, destination, q_table):
 def main():
     alpha = 0.1  # Learning rate
     gamma = 0.6  # Discount rate
-    iterations = 10000  # Number of iterations for the Q-learning algorithm
+    iterations = 10000  # Maximum number of iterations for the Q-learning algorithm
+    tolerance = 1e-6  # Stop once no Q-value moves more than this for `patience` iterations
+    patience = 100
 
     # Initialize the graph
     graph = Graph()
@@ -96,11 +100,18 @@ def main():
     # Initialize Q-table
     q_table = {}
 
-    # Run Q-learning
+    # Run Q-learning until the Q-table and its greedy policy stop changing
+    monitor = ConvergenceMonitor(tolerance, patience)
     for _ in range(iterations):
+        before = dict(q_table)
+        updates = 0
         for vehicle in vehicles:
             if vehicle.current_node != vehicle.destination:
                 update_q_table(graph, vehicle, vehicle.current_node, q_table, alpha, gamma)
+                updates += 1
+        if monitor.observe_dict(before, q_table, updates):
+            break
+    print(f"Q-learning stopped after {monitor.episodes} of {iterations} iterations")
 
     # Output results
     total_time = 0
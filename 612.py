@@ -1,5 +1,7 @@
 # Revised simulation considering the new requirements from the image provided.
 
+from perf_stats import stats
+
 class TrafficGraph:
     def __init__(self):
         self.edges = {}  # dictionary to hold edges and their respective travel times
@@ -51,16 +53,23 @@ class Vehicle:
 # Simulation function considering simultaneous movement of vehicles
 def simulate_traffic(graph, vehicles, agent):
     # Run until all vehicles reach their destination
-    while any(vehicle.current != vehicle.destination for vehicle in vehicles):
-        graph.update_congestion()  # Update congestion delay based on the number of vehicles
-        for vehicle in vehicles:
-            if vehicle.current != vehicle.destination:
-                current_state = vehicle.current
-                action = agent.choose_action(current_state)  # Choose next edge based on Q-values
-                vehicle.move(action[1], graph)  # Move vehicle to next node
-                reward = -graph.get_edge(*action).travel_time  # Negative reward of travel time
-                next_state = vehicle.current
-                agent.learn(current_state, action, reward, next_state)
+    steps = hops = 0
+    with stats.phase("simulate_traffic"):
+        while any(vehicle.current != vehicle.destination for vehicle in vehicles):
+            graph.update_congestion()  # Update congestion delay based on the number of vehicles
+            steps += 1
+            for vehicle in vehicles:
+                if vehicle.current != vehicle.destination:
+                    current_state = vehicle.current
+                    action = agent.choose_action(current_state)  # Choose next edge based on Q-values
+                    vehicle.move(action[1], graph)  # Move vehicle to next node
+                    reward = -graph.get_edge(*action).travel_time  # Negative reward of travel time
+                    next_state = vehicle.current
+                    agent.learn(current_state, action, reward, next_state)
+                    hops += 1
+    stats.count("steps", steps)
+    stats.count("hops", hops)
+    stats.rate_of("steps", "simulate_traffic")
 
     # Output the results after all vehicles have reached their destinations
     total_time = sum(v.total_time for v in vehicles)
@@ -2,26 +2,14 @@
 # CP468 AI ASSIGNMENT 1 QUESTION 4
 # ----------------------
 
-class Edge:
-    def __init__(self):
-        self.vehicles = 0
-
-    def enter(self):
-        self.vehicles += 1
-
-    def exit(self):
-        self.vehicles -= 1
-        if self.vehicles < 0:
-            self.vehicles = 0
-            
-class Node:
-    def __init__(self, id, is_intersection):
-        self.id = id  # Unique identifier for this node.
-        self.is_intersection = is_intersection  # Boolean flag to determine if this node is an intersection.
-        self.edges = {}  # Dictionary to store edges associated with this node, indexed by their end node.
-
-    def add_edge(self, end):
-        self.edges[end] = Edge()  # Create an edge to the given end node and store it in the dictionary.
+import sys
+
+import tracing
+from csr_graph import CSRGraph
+from demand import iter_vehicles
+from perf_stats import stats
+from routing import k_shortest_paths
+from traffic_assignment import frank_wolfe
 
 class Vehicle:
     def __init__(self, start, end):
@@ -29,44 +17,10 @@ class Vehicle:
         self.destination = end  # The destination node of the vehicle.
         self.time = 0  # The total time the vehicle has spent so far.
 
-class Graph:
-    def __init__(self):
-        self.nodes = {}  # Dictionary to store all nodes in the graph, indexed by their id.
-
-    def add_node(self, id, is_intersection):
-        self.nodes[id] = Node(id, is_intersection)  # Add a node with the given id and intersection status to the graph.
-
-    def add_edge(self, start, end):
-        # Add an edge between the given start and end nodes if both exist in the graph.
-        if start in self.nodes and end in self.nodes:
-            self.nodes[start].add_edge(end)  # Add the edge from start to end.
-
-def heuristic_cost_estimate(current, goal):
-    # Estimate the cost from the current node to the goal node.
-    # Using the absolute difference as a simple heuristic.
-    return abs(current - goal)
-
 def travel_time(graph, start, end):
-    base_time = 1
-    edge_delay = graph.nodes[start].edges[end].vehicles * 0.01
-    node_delay = 3 if graph.nodes[end].is_intersection else 0
-    return base_time + edge_delay + node_delay
-
-
-def find_all_paths(graph, start, end, path=[]):
-    path = path + [start]
-    if start == end:
-        return [path]
-    if start not in graph.nodes:
-        return []
-    paths = []
-    for node in graph.nodes[start].edges:
-        if node not in path:
-            newpaths = find_all_paths(graph, node, end, path)
-            for newpath in newpaths:
-                paths.append(newpath)
-    return paths
-
+    # Read from the graph's per-edge cost cache (base + congestion + intersection delay),
+    # which enter/exit keep up to date.
+    return graph.travel_time(start, end)
 
 
 def calculate_path_time(graph, path):
@@ -79,12 +33,14 @@ def calculate_path_time(graph, path):
     return total_time
 
 
-def q_learning(graph, vehicle):
-    all_paths = find_all_paths(graph, vehicle.current_node, vehicle.destination)
-    # This dictionary will hold the total time for each path, considering congestion.
-    path_times = {tuple(path): calculate_path_time(graph, path) for path in all_paths}
-    # Find the path with the minimum time considering congestion.
-    best_path = min(path_times, key=path_times.get)
+def q_learning(graph, vehicle, alternatives=5):
+    # This dictionary will hold the time of the best few paths, considering congestion.
+    # They are generated lazily in increasing time, so the rest are never enumerated.
+    with stats.phase("path_enumeration"):
+        path_times = k_shortest_paths(graph, vehicle.current_node, vehicle.destination, alternatives)
+    # The first path generated is the one with the minimum time; None when the
+    # destination cannot be reached at all.
+    best_path = next(iter(path_times), None)
     return path_times, best_path
 
 
@@ -98,19 +54,53 @@ def simulate_vehicle_movement(graph, vehicle, best_path):
         graph.nodes[start].edges[end].enter()  # Enter edge to simulate congestion.
         vehicle.time += travel_time(graph, start, end)  # Add travel time including congestion delay.
 
-def q_learning_simulation(graph, vehicles):
-    # Find best paths for all vehicles first without simulating movement.
+def timed_movement(congestion, vehicle):
+    # Time-dependent alternative: route on the congestion each edge will have when the
+    # vehicle actually enters it (departing at its start_time), then book the trip so
+    # only vehicles overlapping it in time slow each other down.
+    depart = getattr(vehicle, "start_time", 0.0)
+    best_path, edges, time = congestion.route(vehicle.current_node, vehicle.destination, depart)
+    if best_path is None:
+        return {}, None
+    vehicle.time += congestion.book_route(edges, depart) - depart
+    return {tuple(best_path): time}, tuple(best_path)
+
+def q_learning_simulation(graph, vehicles, congestion=None):
+    # vehicles may be a list or a lazy stream (see demand.iter_vehicles); each one is
+    # routed and moved as it arrives, so nothing but the running total is kept.
+    # congestion is an optional time_expanded.TimeExpandedCongestion for the same graph.
+    total_time = 0
     for vehicle in vehicles:
-        path_times, best_path = q_learning(graph, vehicle)
-        simulate_vehicle_movement(graph, vehicle, best_path)
-        print(f"Vehicle from {vehicle.current_node} to {vehicle.destination}:")
-        print("All path times:", path_times)
-        print("Best path:", best_path, "with time", vehicle.time)
-
-    # Calculate the total time after all vehicles have moved.
-    total_time = sum(vehicle.time for vehicle in vehicles)
+        if congestion is not None:
+            with stats.phase("movement"):
+                path_times, best_path = timed_movement(congestion, vehicle)
+            if best_path is None:
+                continue  # No route to the destination.
+        else:
+            path_times, best_path = q_learning(graph, vehicle)
+            if best_path is None:
+                continue  # No route to the destination.
+            with stats.phase("movement"):
+                simulate_vehicle_movement(graph, vehicle, best_path)
+        stats.count("vehicles")
+        stats.count("hops", len(best_path) - 1)
+        if tracing.level >= tracing.INFO:
+            tracing.emit("path_choice", start=vehicle.current_node, destination=vehicle.destination,
+                         alternatives=[[list(path), time] for path, time in path_times.items()],
+                         best=list(best_path), time=vehicle.time)
+        total_time += vehicle.time
+
+    # The total time after all vehicles have moved.
     return total_time
 
+def assignment_simulation(graph, vehicles, objective="ue", max_iterations=50):
+    # All vehicles routed together (Frank-Wolfe traffic assignment) instead of one after
+    # another, so the result no longer depends on their order. objective is "ue" (user
+    # equilibrium) or "so" (system optimum); returns the total time of all vehicles.
+    assignment = frank_wolfe(graph, [(vehicle.current_node, vehicle.destination) for vehicle in vehicles],
+                             objective, max_iterations)
+    return assignment.total_time
+
 
 
 
@@ -118,8 +108,8 @@ def q_learning_simulation(graph, vehicles):
 
 
 
-def main():
-    graph = Graph()
+def main(trips_path=None):
+    graph = CSRGraph()
     # ... [Unchanged code to initialize graph and vehicles]
     # Define nodes and whether they are intersections or not.
     for i in range(1, 7):
@@ -145,11 +135,13 @@ def main():
 
 
 
-    vehicles = [Vehicle(1, 5), Vehicle(5, 1), Vehicle(3, 5)]
+    # A trip log (CSV or JSON lines) given on the command line is streamed instead.
+    vehicles = iter_vehicles(trips_path, Vehicle) if trips_path else [Vehicle(1, 5), Vehicle(5, 1), Vehicle(3, 5)]
 
     # Run the q_learning simulation and print results.
     total_time = q_learning_simulation(graph, vehicles)
     print(f"Total time taken for all vehicles: {total_time}")
 
 # Run the main function.
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
@@ -2,34 +2,7 @@
 # CP468 AI ASSIGNMENT 1 QUESTION 4
 # ----------------------
 
-
-class Edge:
-    def __init__(self):
-        self.vehicles = 0
-        self.congestion_delay = 0  # New attribute for congestion delay
-
-    def enter(self):
-        self.vehicles += 1
-        self.calculate_congestion_delay()  # Calculate congestion delay whenever a vehicle enters
-
-    def exit(self):
-        self.vehicles -= 1
-        if self.vehicles < 0:
-            self.vehicles = 0
-        self.calculate_congestion_delay()  # Update congestion delay whenever a vehicle exits
-
-    def calculate_congestion_delay(self):
-        self.congestion_delay = 0.01 * self.vehicles  # Congestion delay is 0.01 * number of vehicles
-class Node:
-    def __init__(self, id, is_intersection):
-        self.id = id
-        self.is_intersection = is_intersection
-        self.intersection_delay = 3 if is_intersection else 0  # New attribute for intersection delay
-
-    # Other methods of the Node class remain unchanged
-    def add_edge(self, end):
-        self.edges[end] = Edge()  # Create an edge to the given end node and store it in the dictionary.
-
+from csr_graph import CSRGraph
 
 class Vehicle:
     def __init__(self, start, end):
@@ -37,28 +10,15 @@ class Vehicle:
         self.destination = end  # The destination node of the vehicle.
         self.time = 0  # The total time the vehicle has spent so far.
 
-class Graph:
-    def __init__(self):
-        self.nodes = {}  # Dictionary to store all nodes in the graph, indexed by their id.
-
-    def add_node(self, id, is_intersection):
-        self.nodes[id] = Node(id, is_intersection)  # Add a node with the given id and intersection status to the graph.
-
-    def add_edge(self, start, end):
-        # Add an edge between the given start and end nodes if both exist in the graph.
-        if start in self.nodes and end in self.nodes:
-            self.nodes[start].add_edge(end)  # Add the edge from start to end.
-
 def heuristic_cost_estimate(current, goal):
     # Estimate the cost from the current node to the goal node.
     # Using the absolute difference as a simple heuristic.
     return abs(current - goal)
 
 def travel_time(graph, start, end):
-    base_time = 1
-    edge_delay = graph.nodes[start].edges[end].vehicles * 0.01
-    node_delay = 3 if graph.nodes[end].is_intersection else 0
-    return base_time + edge_delay + node_delay
+    # Read from the graph's per-edge cost cache (base + congestion + intersection delay),
+    # which enter/exit keep up to date.
+    return graph.travel_time(start, end)
 
 
 def find_all_paths(graph, start, end, path=[]):
@@ -127,7 +87,7 @@ def q_learning_simulation(graph, vehicles):
 
 
 def main():
-    graph = Graph()
+    graph = CSRGraph()
     # ... [Unchanged code to initialize graph and vehicles]
     # Define nodes and whether they are intersections or not.
     for i in range(1, 7):
@@ -160,5 +120,6 @@ def main():
     print(f"Total time taken for all vehicles: {total_time}")
 
 # Run the main function.
-main()
+if __name__ == "__main__":
+    main()
 # Integrate travel time calculation with congestion and intersection delay here
\ No newline at end of file
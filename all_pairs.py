@@ -0,0 +1,147 @@
+# ----------------------
+# Parallel travel-time matrix for seeding Q-tables and heuristics
+# ----------------------
+# times[d, v] is the shortest travel time from node index v to the d-th destination,
+# computed with one reverse Dijkstra per destination. Destinations are split across a
+# process pool and the result is stored as float32 (4 bytes per entry), so the full
+# all-pairs matrix of a 10k-node network is 400 MB and the all-to-destinations
+# matrix of the usual handful of destinations is tiny.
+# With a discount < 1 the matrix holds discounted remaining times instead,
+#   D(v) = min over edges v -> w of  cost + discount * D(w),   D(destination) = 0,
+# which is exactly what a Q-learner with that discount converges to: seeding Q-values
+# with -(edge time + discount * D(end node)) starts it at its own fixed point (and at
+# the optimal policy) instead of at zero. The undiscounted matrix is the one to use as
+# a heuristic.
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from perf_stats import stats
+from routing import shortest_times
+
+UNREACHABLE_PENALTY = 1e6  # Q seed for actions that cannot reach the destination.
+
+_worker_graph = None
+_worker_weights = None
+_worker_discount = 1.0
+_worker_dtype = np.float32
+
+
+def _init_worker(graph, weights, discount=1.0, dtype=np.float32):
+    global _worker_graph, _worker_weights, _worker_discount, _worker_dtype
+    _worker_graph, _worker_weights, _worker_discount, _worker_dtype = graph, weights, discount, dtype
+
+
+def _times_to(destination_indices):
+    if _worker_discount == 1.0:
+        return [shortest_times(_worker_graph, d, _worker_weights, reverse=True).astype(_worker_dtype)
+                for d in destination_indices]
+    return [discounted_times(_worker_graph, d, _worker_discount, _worker_weights).astype(_worker_dtype)
+            for d in destination_indices]
+
+
+def discounted_times(graph, destination, discount, weights=None):
+    # D(v) above for one destination node index (inf where it cannot be reached).
+    # Discounting breaks Dijkstra's settling order (a longer path can be cheaper once
+    # its later edges are discounted), so this runs Bellman-Ford sweeps over all edges
+    # until the values stop moving: one per hop of the longest optimal path, plus the
+    # geometric tail of paths that circle (with discount < 1, circling forever costs
+    # about cost / (1 - discount), which beats reaching a destination farther away
+    # than that, and the learners converge to exactly that policy).
+    cost = graph.cost if weights is None else weights
+    offsets, targets = graph.offsets, graph.targets
+    has_edges = offsets[1:] > offsets[:-1]
+    starts = offsets[:-1][has_edges]
+    remaining = np.full(graph.num_nodes, np.inf)
+    remaining[destination] = 0.0
+    tail = int(np.ceil(np.log(1e-16) / np.log(discount))) if discount < 1 else 0
+    for _ in range(graph.num_nodes + tail):
+        through = cost + discount * remaining[targets]
+        best = np.full(graph.num_nodes, np.inf)
+        if len(through):
+            best[has_edges] = np.minimum.reduceat(through, starts)
+        best[destination] = 0.0
+        stats.count("bellman_ford_sweeps")
+        if np.allclose(best, remaining, rtol=1e-15, atol=0.0):
+            break
+        remaining = best
+    return remaining
+
+
+def travel_time_matrix(graph, destinations=None, weights=None, workers=None, chunk_size=64, discount=1.0,
+                       dtype=np.float32):
+    # Returns (times, destination_indices). destinations are node ids (default: every
+    # node, i.e. all pairs); weights defaults to the current cached edge costs.
+    # discount < 1 gives discounted remaining times for seeding Q-learners with that
+    # discount factor. Seeds want dtype=np.float64: float32 rounding splits routes of
+    # equal time (common on grids) and the learner then keeps switching between them.
+    graph.build()
+    if destinations is None:
+        indices = np.arange(graph.num_nodes)
+    else:
+        indices = graph._lookup(list(destinations))
+        if (indices < 0).any():
+            raise KeyError("destination not in graph")
+    weights = graph.cost if weights is None else weights
+    times = np.empty((len(indices), graph.num_nodes), dtype=dtype)
+    chunks = [indices[i:i + chunk_size].tolist() for i in range(0, len(indices), chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        _init_worker(graph, weights, discount, dtype)
+        results = map(_times_to, chunks)
+        row = 0
+        for rows in results:
+            times[row:row + len(rows)] = rows
+            row += len(rows)
+        return times, indices
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(graph, weights, discount, dtype)) as pool:
+        row = 0
+        for rows in pool.map(_times_to, chunks):
+            times[row:row + len(rows)] = rows
+            row += len(rows)
+    return times, indices
+
+
+def edge_q_seed(graph, times_to_destination, discount):
+    # Per-edge Q seed for one destination (BatchTrainer q):
+    # -(time of the edge + discount * remaining time from its end node), where the row
+    # comes from travel_time_matrix(..., discount=discount, dtype=np.float64) with the
+    # trainer's discount.
+    # BatchTrainer and A2_QLearning keep one destination-agnostic Q per edge, so this
+    # only fits when all their vehicles share the destination; with mixed destinations
+    # use a QTable and seed_q_table.
+    remaining = times_to_destination[graph.targets].astype(np.float64)
+    remaining[~np.isfinite(remaining)] = UNREACHABLE_PENALTY
+    return -(graph.cost + discount * remaining)
+
+
+def seed_q_table(q_table, times, destination_indices, discount):
+    # Fill a QTable (node, destination, slot) from a travel_time_matrix result built
+    # with the learner's discount. The destination's own actions stay 0, as they are
+    # never updated (vehicles stop there), so its value acts as the terminal 0.
+    graph = q_table.graph
+    row_of = {int(d): r for r, d in enumerate(destination_indices)}
+    sources = graph.edge_sources()
+    slots = np.arange(graph.num_edges) - graph.offsets[sources]
+    for dest_id, d in q_table.dest_index.items():
+        goal = graph.index_of(dest_id)
+        seed = edge_q_seed(graph, times[row_of[goal]], discount)
+        seed[sources == goal] = 0.0
+        q_table.values[sources, d, slots] = seed
+    return q_table
+
+
+class MatrixHeuristic:
+    # Exact remaining time as an A* heuristic: heuristic(node_index, goal_index).
+    # Admissible for live costs too when the matrix was built on free-flow weights
+    # (and the default discount of 1). The float32 entries can round up, so they are
+    # scaled down by the same slack as Landmarks.bounds.
+    def __init__(self, times, destination_indices):
+        self.times = times
+        self.row_of = {int(d): r for r, d in enumerate(destination_indices)}
+        self.slack = 1 - 1e-6
+
+    def __call__(self, node, goal):
+        t = float(self.times[self.row_of[goal], node])
+        return t * self.slack if t != float('inf') else 0.0
@@ -0,0 +1,169 @@
+# ----------------------
+# Batched multi-vehicle Q-learning trainer
+# ----------------------
+# Same per-edge Q-learning as A2_QLearning (Q lives on edges, reward is the negative
+# travel time), but thousands of vehicles advance together as NumPy arrays:
+# epsilon-greedy selection over a padded (node, slot) edge matrix, a gather of the
+# next node's max Q, and a scatter-add of the updates back into the edge Q array.
+
+import numpy as np
+
+from convergence import ConvergenceMonitor, greedy_edges
+from perf_stats import stats
+
+
+def padded_edges(graph):
+    # (nodes, max_degree) matrix of outgoing edge indices, -1 past each node's degree.
+    graph.build()
+    degree = np.diff(graph.offsets)
+    max_degree = max(int(degree.max()) if len(degree) else 0, 1)
+    slots = np.arange(max_degree)
+    valid = slots < degree[:, None]
+    return np.where(valid, graph.offsets[:-1, None] + slots, -1), degree
+
+
+class BatchTrainer:
+    def __init__(self, graph, starts, destinations, learning_rate, discount_factor, epsilon,
+                 q=None, rng=None, max_steps=None):
+        # starts/destinations are node ids, one pair per simulated vehicle.
+        # q is the per-edge Q array to train (defaults to graph.q_value, which is what
+        # A2_QLearning reads through edge.q_value).
+        self.graph = graph.build()
+        self.edges, self.degree = padded_edges(graph)
+        self.starts = graph._lookup(starts)
+        self.destinations = graph._lookup(destinations)
+        if (self.starts < 0).any() or (self.destinations < 0).any():
+            raise KeyError("start or destination node not in graph")
+        if (self.degree[self.starts] == 0).any():
+            # Such a vehicle would be reset onto its start forever without an edge to take.
+            raise ValueError("start node has no outgoing edges")
+        self.learning_rate = learning_rate
+        self.discount_factor = discount_factor
+        self.epsilon = epsilon
+        self.q = graph.q_value if q is None else q
+        self.rng = np.random.default_rng() if rng is None else rng
+        # An episode is cut off after max_steps hops (vehicles can loop while exploring).
+        self.max_steps = 4 * graph.num_nodes if max_steps is None else max_steps
+
+        self.current = self.starts.copy()
+        self.steps = np.zeros(len(self.starts), dtype=np.int64)
+        self.transitions = 0  # Total Q-updates applied.
+        self.episodes = 0  # Total episodes finished (destination reached or cut off).
+        self.convergence = None  # ConvergenceMonitor of the last train(tolerance=...) call.
+        self.reset_finished()
+
+    def reset_finished(self):
+        # Vehicles at their destination (or stuck at a dead end) start a new episode.
+        done = (self.current == self.destinations) | (self.degree[self.current] == 0)
+        self.current[done] = self.starts[done]
+        self.steps[done] = 0
+        return done
+
+    def node_q(self, nodes):
+        # Q-values of every outgoing slot of each node, -inf on padding.
+        edges = self.edges[nodes]
+        return np.where(edges >= 0, self.q[edges], -np.inf)
+
+    def step(self):
+        # Advance every vehicle one hop and apply all their Q-updates at once.
+        cur = self.current
+        n = len(cur)
+        degree = self.degree[cur]
+        greedy = self.node_q(cur).argmax(axis=1)
+        random_slots = (self.rng.random(n) * degree).astype(np.int64)
+        slots = np.where(self.rng.random(n) < self.epsilon, random_slots, greedy)
+        edges = self.graph.offsets[cur] + slots
+        nxt = self.graph.targets[edges]
+
+        # Reward is the negative travel time; the future value is the best Q out of
+        # the next node, or 0 when it is the vehicle's destination or a dead end.
+        reward = -self.graph.cost[edges]
+        terminal = (nxt == self.destinations) | (self.degree[nxt] == 0)
+        future = np.where(terminal, 0.0, self.node_q(nxt).max(axis=1))
+        delta = self.learning_rate * (reward + self.discount_factor * future - self.q[edges])
+        # Vehicles sharing an edge in this step contribute their mean update (a summed
+        # update would scale the learning rate by the crowd size and diverge). Only the
+        # touched edges are written, so concurrent trainers sharing q (see
+        # shared_training) never rewrite values they did not update.
+        touched, slot = np.unique(edges, return_inverse=True)
+        self.q[touched] += np.bincount(slot, weights=delta) / np.bincount(slot)
+
+        self.current = nxt
+        self.steps += 1
+        self.transitions += n
+        stats.count("q_updates", n)
+        cut_off = self.steps >= self.max_steps
+        self.current[cut_off] = self.destinations[cut_off]
+        finished = int(self.reset_finished().sum())
+        self.episodes += finished
+        stats.count("episodes", finished)
+        return finished
+
+    def train(self, episodes, checkpoint=None, tolerance=None, patience=5):
+        # Run until the vehicles have finished `episodes` episodes each on average.
+        # checkpoint(episodes per vehicle, q) is called after every step that finished
+        # an episode (see q_checkpoint.Checkpointer). With a tolerance, training stops
+        # early once every round of len(starts) episodes leaves max |delta Q| within it
+        # and the greedy policy unchanged for `patience` rounds (see self.convergence).
+        target = self.episodes + episodes * len(self.starts)
+        monitor = self.convergence = ConvergenceMonitor(tolerance, patience) if tolerance is not None else None
+        round_end = self.episodes + len(self.starts)
+        if monitor is not None:
+            before, policy = self.q.copy(), greedy_edges(self.graph, self.q)
+            transitions = self.transitions
+        with stats.phase("batch_training"):
+            while self.episodes < target:
+                if self.step() and checkpoint is not None:
+                    checkpoint(self.episodes // len(self.starts), self.q)
+                if monitor is not None and self.episodes >= round_end:
+                    round_end = self.episodes + len(self.starts)
+                    new_policy = greedy_edges(self.graph, self.q)
+                    if monitor.observe(before, self.q, policy, new_policy, self.transitions - transitions):
+                        break
+                    before, policy, transitions = self.q.copy(), new_policy, self.transitions
+        stats.rate_of("q_updates", "batch_training")
+        return self.q
+
+
+def train_batched(graph, vehicles, episodes, learning_rate, discount_factor, epsilon,
+                  batch_size=4096, rng=None):
+    # Train on copies of the given vehicles so about batch_size of them move per step.
+    copies = max(batch_size // max(len(vehicles), 1), 1)
+    starts = np.tile([vehicle.current_node for vehicle in vehicles], copies)
+    destinations = np.tile([vehicle.destination for vehicle in vehicles], copies)
+    trainer = BatchTrainer(graph, starts, destinations, learning_rate, discount_factor, epsilon, rng=rng)
+    trainer.train(max(episodes // copies, 1))
+    return trainer
+
+
+def train_stream(graph, trip_chunks, episodes, learning_rate, discount_factor, epsilon,
+                 q=None, rng=None):
+    # Train on demand that arrives in chunks (see demand.read_trip_chunks); each chunk
+    # of (start, destination, ...) trips becomes one batch updating the same Q array,
+    # so only one chunk is ever held in memory.
+    q = graph.q_value if q is None else q
+    rng = np.random.default_rng() if rng is None else rng
+    for chunk in trip_chunks:
+        starts = [trip[0] for trip in chunk]
+        destinations = [trip[1] for trip in chunk]
+        BatchTrainer(graph, starts, destinations, learning_rate, discount_factor, epsilon,
+                     q=q, rng=rng).train(episodes)
+    return q
+
+
+def greedy_route(graph, q, start, destination, max_hops=None):
+    # Follow the highest-Q edge from start; returns (path, time), time is inf when the
+    # destination is not reached within max_hops.
+    offsets = graph.offsets
+    max_hops = 4 * graph.num_nodes if max_hops is None else max_hops
+    node, goal = graph.index_of(start), graph.index_of(destination)
+    path, time = [node], 0.0
+    while node != goal and len(path) <= max_hops and offsets[node + 1] > offsets[node]:
+        lo, hi = int(offsets[node]), int(offsets[node + 1])
+        e = lo + int(np.argmax(q[lo:hi]))
+        time += float(graph.cost[e])
+        node = int(graph.targets[e])
+        path.append(node)
+    if node != goal:
+        time = float('inf')
+    return graph.node_ids[path].tolist(), time
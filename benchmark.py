@@ -0,0 +1,192 @@
+# ----------------------
+# Cross-solver scaling benchmark
+# ----------------------
+# Runs every solver on reproducible synthetic networks (see networks.py) and prints a
+# runtime / memory / solution-quality table. Each (network, solver) case runs in its
+# own child process with a wall-clock limit and an address-space limit, so one
+# exponential solver cannot take the whole benchmark down with it.
+#
+#   python benchmark.py --sizes 1000 10000 --vehicles 100 --time-limit 60
+
+import argparse
+import contextlib
+import importlib.machinery
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import resource
+import time
+
+from batch_trainer import greedy_route, train_batched
+from networks import grid_network, random_demand, random_geometric_network, ring_network
+from perf_stats import stats
+from routing import dijkstra
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_script(name, filename):
+    # The solver scripts are not packages (A2_QLearning has no .py suffix), so load
+    # them by path; their main() only runs under __main__.
+    loader = importlib.machinery.SourceFileLoader(name, os.path.join(HERE, filename))
+    spec = importlib.util.spec_from_loader(name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+class Vehicle:
+    def __init__(self, start, end):
+        self.current_node = start
+        self.destination = end
+        self.time = 0
+        self.path = []
+
+
+def _route_totals(times):
+    reached = [t for t in times if t != float('inf')]
+    return {"total_time": sum(reached), "unreached": len(times) - len(reached)}
+
+
+# --- Solvers: each takes (graph, demand) and returns a quality dict ---
+
+def solve_local_search(graph, demand):
+    bnart = _load_script("bnartFINAL", "bnartFINAL.py")
+    vehicles = [Vehicle(start, end) for start, end in demand]
+    bnart.local_search(graph, vehicles)
+    return _route_totals([v.time if v.current_node == v.destination else float('inf') for v in vehicles])
+
+
+def solve_find_all_paths(graph, demand):
+    enumerating = _load_script("Modified_QLearning", "Modified_QLearning.py")
+    times = []
+    for start, end in demand:
+        paths = enumerating.find_all_paths(graph, start, end)
+        times.append(min((enumerating.calculate_path_time(graph, p) for p in paths), default=float('inf')))
+    return _route_totals(times)
+
+
+def solve_dijkstra(graph, demand):
+    return _route_totals([dijkstra(graph, start, end)[1] for start, end in demand])
+
+
+def solve_a2_q_learning(graph, demand, episodes=100):
+    a2 = _load_script("A2_QLearning", "A2_QLearning")
+    vehicles = [Vehicle(start, end) for start, end in demand]
+    a2.q_learning_simulation(graph, vehicles, episodes, 0.5, 0.9, 0.1)
+    return _route_totals([greedy_route(graph, graph.q_value, s, e)[1] for s, e in demand])
+
+
+def solve_batched_q_learning(graph, demand, episodes=100):
+    vehicles = [Vehicle(start, end) for start, end in demand]
+    train_batched(graph, vehicles, episodes, 0.5, 0.9, 0.1)
+    return _route_totals([greedy_route(graph, graph.q_value, s, e)[1] for s, e in demand])
+
+
+SOLVERS = {
+    "local_search": solve_local_search,
+    "find_all_paths": solve_find_all_paths,
+    "dijkstra": solve_dijkstra,
+    "a2_q_learning": solve_a2_q_learning,
+    "batched_q_learning": solve_batched_q_learning,
+}
+
+
+def make_network(kind, size, intersection_density, seed):
+    # size is the approximate number of nodes.
+    if kind == "grid":
+        side = max(int(round(size ** 0.5)), 2)
+        return grid_network(side, side, intersection_density, seed)
+    if kind == "ring":
+        spokes = max(int(round((4 * size) ** 0.5)), 3)
+        return ring_network(max(size // spokes, 1), spokes, intersection_density, seed)
+    if kind == "geometric":
+        return random_geometric_network(size, None, intersection_density, seed)
+    raise ValueError(f"unknown network kind {kind!r}")
+
+
+def _run_case(conn, kind, size, solver, vehicles, intersection_density, seed, memory_limit_mb):
+    # Child process body: limit memory, build the network, time the solver.
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    try:
+        graph = make_network(kind, size, intersection_density, seed)
+        demand = random_demand(graph, vehicles, seed)
+        stats.reset()
+        began = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # Solvers print per vehicle.
+            quality = SOLVERS[solver](graph, demand)
+        seconds = time.perf_counter() - began
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        conn.send({"status": "ok", "nodes": graph.num_nodes, "edges": graph.num_edges,
+                   "seconds": seconds, "peak_mb": peak_mb, **quality, "stats": stats.as_dict()})
+    except MemoryError:
+        conn.send({"status": "memory"})
+    except RecursionError:
+        conn.send({"status": "recursion"})
+    finally:
+        conn.close()
+
+
+def run_case(kind, size, solver, vehicles, intersection_density, seed, time_limit, memory_limit_mb):
+    context = multiprocessing.get_context("fork")
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=_run_case, args=(child, kind, size, solver, vehicles,
+                                                      intersection_density, seed, memory_limit_mb))
+    process.start()
+    child.close()
+    result = {"status": "timeout"}
+    if parent.poll(time_limit):
+        try:
+            result = parent.recv()
+        except EOFError:
+            result = {"status": "crashed"}
+    process.kill()
+    process.join()
+    return {"network": kind, "size": size, "solver": solver, **result}
+
+
+def format_table(rows):
+    header = f"{'network':<10}{'size':>9}{'edges':>10}  {'solver':<20}{'status':<9}{'seconds':>9}{'peak MB':>9}{'total time':>13}{'unreached':>10}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        if row["status"] == "ok":
+            lines.append(f"{row['network']:<10}{row['size']:>9}{row['edges']:>10}  {row['solver']:<20}{'ok':<9}"
+                         f"{row['seconds']:>9.3f}{row['peak_mb']:>9.1f}{row['total_time']:>13.2f}{row['unreached']:>10}")
+        else:
+            lines.append(f"{row['network']:<10}{row['size']:>9}{'':>10}  {row['solver']:<20}{row['status']:<9}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-solver scaling benchmark")
+    parser.add_argument("--networks", nargs="+", default=["grid", "ring", "geometric"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--solvers", nargs="+", default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument("--vehicles", type=int, default=100)
+    parser.add_argument("--intersection-density", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, default=60.0, help="seconds per case")
+    parser.add_argument("--memory-limit", type=int, default=4096, help="MB per case, 0 for none")
+    parser.add_argument("--json", help="also write the rows to this file")
+    args = parser.parse_args()
+
+    rows = []
+    for kind in args.networks:
+        for size in args.sizes:
+            for solver in args.solvers:
+                rows.append(run_case(kind, size, solver, args.vehicles, args.intersection_density,
+                                     args.seed, args.time_limit, args.memory_limit))
+                print(format_table(rows[-1:]).splitlines()[-1], flush=True)
+    print()
+    print(format_table(rows))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
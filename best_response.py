@@ -0,0 +1,78 @@
+# ----------------------
+# Multi-vehicle route coordination by best-response dynamics
+# ----------------------
+# Instead of scoring every combination of paths for all vehicles (exponential in the
+# number of vehicles), vehicles take turns re-routing against the loads the others
+# have committed: remove my route from the per-edge loads, find my shortest path under
+#   cost(e) = free-flow time + CONGESTION_FACTOR * (vehicles of others on e),
+# and switch if it is strictly faster. Only the edges of the old and new route change,
+# so loads and weights are updated by small deltas. This is a congestion game with a
+# potential function, so every switch lowers the potential and the loop ends at an
+# equilibrium where no vehicle can improve alone; a round costs one shortest-path search
+# per vehicle, so the whole solve is polynomial in the fleet size.
+
+import numpy as np
+
+from csr_graph import CONGESTION_FACTOR
+from routing import edges_to_path, search_edges
+
+
+class Coordination:
+    def __init__(self, graph, routes, times, rounds, converged):
+        self.graph = graph
+        self.routes = routes  # Node id path of each vehicle (None when unreachable).
+        self.times = times  # Travel time of each vehicle given everyone else's route.
+        self.rounds = rounds
+        self.converged = converged  # True when no vehicle could improve any more.
+
+    @property
+    def total_time(self):
+        return sum(t for t in self.times if t != float('inf'))
+
+
+def best_response_routing(graph, trips, free_flow=None, max_rounds=50, min_gain=1e-9):
+    # trips is a list of (start id, destination id); free_flow overrides the
+    # uncongested time of each edge (default: base time plus intersection delay).
+    graph.build()
+    if free_flow is None:
+        free_flow = graph.free_flow_cost()
+    loads = np.zeros(graph.num_edges, dtype=np.int64)
+    weights = np.asarray(free_flow, dtype=np.float64).copy()  # free_flow + c * loads, kept in sync.
+    ends = [(graph.index_of(start), graph.index_of(end)) for start, end in trips]
+    routes = [None] * len(trips)  # Edge index lists.
+
+    def commit(edges, delta):
+        np.add.at(loads, edges, delta)
+        weights[edges] = free_flow[edges] + CONGESTION_FACTOR * loads[edges]
+
+    rounds, converged = 0, False
+    while rounds < max_rounds and not converged:
+        rounds += 1
+        converged = True
+        for i, (source, target) in enumerate(ends):
+            if source < 0 or target < 0:
+                continue
+            current = routes[i]
+            if current is not None:
+                commit(current, -1)  # Price the network as the others see it.
+            edges, time = search_edges(graph, source, target, weights)
+            if edges is None:
+                continue
+            if current is not None and float(weights[current].sum()) <= time + min_gain:
+                edges = current  # Keep the route unless the new one is strictly faster.
+            else:
+                converged = False
+            routes[i] = edges
+            commit(edges, 1)
+
+    times = []
+    paths = []
+    for (source, _), edges in zip(ends, routes):
+        if edges is None:
+            times.append(float('inf'))
+            paths.append(None)
+            continue
+        # The vehicle's own presence does not slow it down.
+        times.append(float(np.sum(free_flow[edges] + CONGESTION_FACTOR * (loads[edges] - 1))))
+        paths.append(edges_to_path(graph, source, edges))
+    return Coordination(graph, paths, times, rounds, converged)
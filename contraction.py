@@ -0,0 +1,195 @@
+# ----------------------
+# Contraction hierarchy for repeated point-to-point queries
+# ----------------------
+# Preprocessing contracts nodes one at a time, least important first, adding a
+# shortcut u -> w whenever the only shortest u -> w path ran through the removed node.
+# A query then runs two small Dijkstra searches that only ever climb to more important
+# nodes (forward from the start, backward from the end) and meet at the top, so it
+# settles a few hundred nodes at most instead of exploring the whole network.
+#
+# The hierarchy is built on the static free-flow costs (base time plus intersection
+# delay). route() adds the live congestion term by re-pricing the hierarchy's path
+# with the graph's current cached costs.
+
+import heapq
+
+import numpy as np
+
+
+
+class ContractionHierarchy:
+    def __init__(self, graph, weights=None, witness_limit=64):
+        # weights defaults to the free-flow cost of every edge. witness_limit caps the
+        # nodes settled per witness search: a smaller value preprocesses faster but
+        # may add a few unnecessary shortcuts (queries stay exact either way).
+        self.graph = graph.build()
+        if weights is None:
+            weights = graph.free_flow_cost()
+        self.witness_limit = witness_limit
+        n = graph.num_nodes
+
+        # Remaining graph during contraction: out_edges[u][w] / in_edges[w][u] = weight.
+        self.out_edges = [dict() for _ in range(n)]
+        self.in_edges = [dict() for _ in range(n)]
+        for u, w, c in zip(graph.edge_sources().tolist(), graph.targets.tolist(), weights.tolist()):
+            if u != w and c < self.out_edges[u].get(w, float('inf')):
+                self.out_edges[u][w] = c
+                self.in_edges[w][u] = c
+        self.middle = {}  # (u, w) -> contracted node a shortcut u -> w goes through.
+        self.rank = np.zeros(n, dtype=np.int64)
+        self.up = [None] * n  # Forward search edges: v -> higher ranked w.
+        self.down = [None] * n  # Backward search edges: v <- higher ranked u.
+        self._contract_all()
+        del self.out_edges, self.in_edges
+
+    # --- Preprocessing ---
+
+    def _witness(self, source, skip, limit_time, targets):
+        # Bounded Dijkstra from source avoiding skip; distances to the given targets.
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        settled = 0
+        remaining = set(targets)
+        while heap and remaining and settled < self.witness_limit:
+            d, u = heapq.heappop(heap)
+            if d > dist.get(u, float('inf')):
+                continue
+            if d > limit_time:
+                break
+            settled += 1
+            remaining.discard(u)
+            for w, c in self.out_edges[u].items():
+                nd = d + c
+                if w != skip and nd < dist.get(w, float('inf')):
+                    dist[w] = nd
+                    heapq.heappush(heap, (nd, w))
+        return dist
+
+    def _shortcuts(self, v):
+        # Shortcuts needed to contract v: (u, w, weight) with no witness path u -> w.
+        shortcuts = []
+        outs = self.out_edges[v]
+        if not outs:
+            return shortcuts
+        max_out = max(outs.values())
+        for u, cu in self.in_edges[v].items():
+            targets = [w for w in outs if w != u]
+            if not targets:
+                continue
+            dist = self._witness(u, v, cu + max_out, targets)
+            for w in targets:
+                via = cu + outs[w]
+                if dist.get(w, float('inf')) > via:
+                    shortcuts.append((u, w, via))
+        return shortcuts
+
+    def _priority(self, v, contracted_neighbours):
+        # Edge difference plus how many neighbours are already contracted (spreads
+        # the contraction evenly over the network).
+        removed = len(self.out_edges[v]) + len(self.in_edges[v])
+        return len(self._shortcuts(v)) - removed + contracted_neighbours[v]
+
+    def _contract_all(self):
+        n = len(self.out_edges)
+        contracted_neighbours = np.zeros(n, dtype=np.int64)
+        heap = [(self._priority(v, contracted_neighbours), v) for v in range(n)]
+        heapq.heapify(heap)
+        order = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            # Lazy update: re-evaluate and put back if it is no longer the smallest.
+            priority = self._priority(v, contracted_neighbours)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, v))
+                continue
+            for u, w, c in self._shortcuts(v):
+                if c < self.out_edges[u].get(w, float('inf')):
+                    self.out_edges[u][w] = c
+                    self.in_edges[w][u] = c
+                    self.middle[(u, w)] = v
+            self.rank[v] = order
+            order += 1
+            # Everything still attached to v is more important than v from now on.
+            self.up[v] = list(self.out_edges[v].items())
+            self.down[v] = list(self.in_edges[v].items())
+            for w in self.out_edges[v]:
+                del self.in_edges[w][v]
+                contracted_neighbours[w] += 1
+            for u in self.in_edges[v]:
+                del self.out_edges[u][v]
+                contracted_neighbours[u] += 1
+            self.out_edges[v] = {}
+            self.in_edges[v] = {}
+
+    @property
+    def shortcut_count(self):
+        return len(self.middle)
+
+    # --- Queries ---
+
+    def _search(self, source, target):
+        # Bidirectional upward Dijkstra; returns (time, meeting node, parents).
+        dist = ({source: 0.0}, {target: 0.0})
+        parent = ({source: -1}, {target: -1})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        edges = (self.up, self.down)
+        best, meet = float('inf'), -1
+        side = 0
+        while heaps[0] or heaps[1]:
+            if not heaps[side]:
+                side = 1 - side
+            d, u = heapq.heappop(heaps[side])
+            if d <= dist[side].get(u, float('inf')):
+                if d >= best:
+                    heaps[side].clear()  # Nothing left on this side can improve the best.
+                else:
+                    other = dist[1 - side].get(u)
+                    if other is not None and d + other < best:
+                        best, meet = d + other, u
+                    for w, c in edges[side][u]:
+                        nd = d + c
+                        if nd < dist[side].get(w, float('inf')):
+                            dist[side][w] = nd
+                            parent[side][w] = u
+                            heapq.heappush(heaps[side], (nd, w))
+            side = 1 - side
+        return best, meet, parent
+
+    def _unpack(self, u, w, out):
+        # Expand edge u -> w into original edges, appending the nodes after u.
+        v = self.middle.get((u, w))
+        if v is None:
+            out.append(w)
+        else:
+            self._unpack(u, v, out)
+            self._unpack(v, w, out)
+
+    def query(self, start, end):
+        # (path, time) on the hierarchy's static costs; (None, inf) when unreachable.
+        source, target = self.graph.index_of(start), self.graph.index_of(end)
+        if source < 0 or target < 0:
+            return None, float('inf')
+        best, meet, (forward, backward) = self._search(source, target)
+        if meet < 0:
+            return None, float('inf')
+        climb = [meet]
+        while forward[climb[-1]] != -1:
+            climb.append(forward[climb[-1]])
+        climb.reverse()
+        descend = [meet]
+        while backward[descend[-1]] != -1:
+            descend.append(backward[descend[-1]])
+        hops = climb + descend[1:]
+        path = [hops[0]]
+        for u, w in zip(hops, hops[1:]):
+            self._unpack(u, w, path)
+        return self.graph.node_ids[path].tolist(), best
+
+    def route(self, start, end):
+        # Same path as query(), priced with the live (congested) cached edge costs.
+        path, _ = self.query(start, end)
+        if path is None:
+            return None, float('inf')
+        graph = self.graph
+        time = sum(float(graph.cost[graph.edge_between(u, w)]) for u, w in zip(path, path[1:]))
+        return path, time
@@ -0,0 +1,87 @@
+# ----------------------
+# Convergence tracking and early stopping for Q-learning
+# ----------------------
+# After every episode a trainer reports how much its Q-values moved (max and mean
+# |delta Q| over the values that changed) and how many states changed their greedy
+# action. Training is considered converged once max |delta Q| has stayed below the
+# tolerance with an unchanged greedy policy for `patience` episodes in a row, so a
+# small network stops after a handful of episodes instead of a fixed budget. Episodes
+# that applied no Q-updates at all say nothing about convergence and are not counted.
+
+import numpy as np
+
+
+class ConvergenceMonitor:
+    def __init__(self, tolerance=1e-4, patience=5):
+        self.tolerance = tolerance
+        self.patience = patience
+        self.max_delta = []  # Per-episode history, for reporting.
+        self.mean_delta = []
+        self.policy_changes = []
+        self.stable = 0  # Consecutive episodes within tolerance.
+        self.converged = False
+
+    @property
+    def episodes(self):
+        return len(self.max_delta)
+
+    def update(self, max_delta, mean_delta, policy_changes, updates=None):
+        # Record one episode; returns True once training can stop. updates is the
+        # number of Q-updates the episode applied (None when the trainer does not say).
+        self.max_delta.append(float(max_delta))
+        self.mean_delta.append(float(mean_delta))
+        self.policy_changes.append(int(policy_changes))
+        if updates == 0:
+            pass  # Nothing was trained, so the streak neither grows nor resets.
+        elif max_delta <= self.tolerance and policy_changes == 0:
+            self.stable += 1
+        else:
+            self.stable = 0
+        self.converged = self.stable >= self.patience
+        return self.converged
+
+    def observe(self, before, after, policy_before=None, policy_after=None, updates=None):
+        # Compare Q arrays (and greedy policies) from before and after an episode.
+        delta = np.abs(np.asarray(after) - np.asarray(before))
+        delta = delta[np.isfinite(delta)]
+        moved = delta[delta > 0]
+        changes = 0 if policy_before is None else int(np.count_nonzero(policy_before != policy_after))
+        return self.update(moved.max() if len(moved) else 0.0, moved.mean() if len(moved) else 0.0, changes,
+                           updates)
+
+    def observe_dict(self, before, after, updates=None):
+        # Same for dict Q-tables keyed by (state, action), as the older scripts use.
+        delta = [abs(value - before.get(key, 0)) for key, value in after.items()]
+        moved = [d for d in delta if d > 0]
+        policy_before, policy_after = greedy_dict(before), greedy_dict(after)
+        changes = sum(policy_before.get(state) != action for state, action in policy_after.items())
+        return self.update(max(moved, default=0.0), sum(moved) / len(moved) if moved else 0.0, changes,
+                           updates)
+
+    def summary(self):
+        return {
+            "episodes": self.episodes,
+            "converged": self.converged,
+            "max_delta": self.max_delta[-1] if self.max_delta else None,
+            "mean_delta": self.mean_delta[-1] if self.mean_delta else None,
+        }
+
+
+def greedy_edges(graph, q):
+    # Greedy outgoing edge of every node under the per-edge Q array (-1 at dead ends);
+    # ties go to the first edge, as argmax does.
+    offsets = graph.offsets
+    order = np.lexsort((-np.asarray(q), graph.edge_sources()))  # By node, best Q first.
+    best = np.full(graph.num_nodes, -1, dtype=np.int64)
+    has_edges = offsets[1:] > offsets[:-1]
+    best[has_edges] = order[offsets[:-1][has_edges]]
+    return best
+
+
+def greedy_dict(q_table):
+    # {state: greedy action} for a dict Q-table keyed by (state, action).
+    best = {}
+    for (state, action), value in q_table.items():
+        if state not in best or value > best[state][1]:
+            best[state] = (action, value)
+    return {state: action for state, (action, _) in best.items()}
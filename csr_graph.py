@@ -0,0 +1,441 @@
+# ----------------------
+# Compact array-backed (CSR) road network shared by the solvers
+# ----------------------
+# The graph is built with the same add_node/add_edge calls the solvers already use,
+# then compacted into flat NumPy arrays:
+#   offsets[i]:offsets[i+1]  -> slice of the edges leaving node index i
+#   targets[e]               -> node index at the end of edge e
+#   vehicles[e]              -> number of vehicles currently on edge e
+#   is_intersection[i]       -> intersection flag of node index i
+#   cost[e]                  -> cached travel time of edge e (kept in sync by enter/exit)
+# Edges whose cost changed since the last take_changed_edges() call are tracked in a
+# dirty set, so batch consumers only re-read what moved; after a rebuild or a
+# refresh_costs() every edge counts as changed.
+# graph.nodes[id].edges[end] still works through light view objects, so the existing
+# travel_time/find_all_paths/Q-learning code runs unchanged against this class. Those
+# per-hop scalar reads go through plain-Python mirrors of the structure (node id ->
+# {target id: edge index} dicts and one view object per node and edge), built lazily
+# on first use after build(), so they cost a couple of dict lookups like the old
+# dict-based Graph instead of NumPy scalar indexing.
+
+import hashlib
+from functools import cached_property
+
+import numpy as np
+
+BASE_TIME = 1  # Base time cost for traveling between any two adjacent nodes.
+INTERSECTION_DELAY = 3  # Added delay when the end node of an edge is an intersection.
+CONGESTION_FACTOR = 0.01  # Delay added per vehicle currently on an edge.
+
+_NO_EDGES = {}  # Out-edges of a node id that is not in the graph.
+
+
+class CSRGraph:
+    def __init__(self):
+        # Builder buffers; they are drained into the arrays by build(). Single add_*
+        # calls go to the Python lists, bulk add_*_from calls append array chunks.
+        self._pending_ids = []
+        self._pending_flags = []
+        self._pending_starts = []
+        self._pending_ends = []
+        self._node_chunks = []  # (ids, flags) array pairs, in call order.
+        self._edge_chunks = []  # (starts, ends) array pairs, in call order.
+        self._dirty = False
+
+        # Compacted arrays.
+        self.node_ids = np.zeros(0, dtype=np.int64)
+        self.is_intersection = np.zeros(0, dtype=bool)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.targets = np.zeros(0, dtype=np.int32)
+        self.vehicles = np.zeros(0, dtype=np.int32)
+        self.cost = np.zeros(0, dtype=np.float64)
+        self._q_value = None  # Per-edge Q-values, only allocated when a solver uses them.
+        self.changed_edges = set()  # Edge indices whose cost changed since last taken.
+        self._all_changed = True  # Every edge changed (nothing has been taken yet).
+        self._sorted_ids = self.node_ids  # node_ids sorted, for O(log n) id -> index lookups.
+        self._sorted_pos = np.zeros(0, dtype=np.int64)
+        self._id_base = None
+        self._out = None  # Node id -> {target id: edge index}, built by _mirror().
+
+    # --- Builder API (same calls as the dict-based Graph classes) ---
+
+    def add_node(self, id, is_intersection):
+        self._pending_ids.append(id)
+        self._pending_flags.append(bool(is_intersection))
+        self._changed()
+
+    def add_edge(self, start, end):
+        # Edges whose endpoints do not exist are dropped at build time, like the
+        # membership check in the original Graph.add_edge.
+        self._pending_starts.append(start)
+        self._pending_ends.append(end)
+        self._changed()
+
+    def add_nodes_from(self, nodes, is_intersection=False):
+        # Bulk add_node. nodes is an array/iterable of ids, or of (id, is_intersection)
+        # pairs; is_intersection is then a scalar or one flag per id.
+        nodes = np.asarray(nodes if isinstance(nodes, np.ndarray) else list(nodes))
+        if nodes.ndim == 2:
+            ids, flags = nodes[:, 0], nodes[:, 1]
+        else:
+            ids, flags = nodes, np.broadcast_to(np.asarray(is_intersection), nodes.shape)
+        self._flush_pending()
+        self._node_chunks.append((ids.astype(np.int64), flags.astype(bool)))
+        self._changed()
+
+    def add_edges_from(self, edges, ends=None, bidirectional=False):
+        # Bulk add_edge. Either an (n, 2) array/iterable of (start, end) pairs, or two
+        # parallel arrays of starts and ends. bidirectional also adds every reverse edge.
+        if ends is None:
+            edges = np.asarray(edges if isinstance(edges, np.ndarray) else list(edges), dtype=np.int64)
+            edges = edges.reshape(-1, 2)
+            starts, ends = edges[:, 0], edges[:, 1]
+        else:
+            starts = np.asarray(edges, dtype=np.int64)
+            ends = np.asarray(ends, dtype=np.int64)
+        if bidirectional:
+            starts, ends = np.concatenate([starts, ends]), np.concatenate([ends, starts])
+        self._flush_pending()
+        self._edge_chunks.append((starts, ends))
+        self._changed()
+
+    def _changed(self):
+        # Pending add_* calls: rebuild on next use and drop the cached graph.nodes.
+        self._dirty = True
+        self.__dict__.pop("nodes", None)
+
+    def _flush_pending(self):
+        # Move single add_* calls into the chunk lists so call order is preserved.
+        if self._pending_ids:
+            self._node_chunks.append((np.asarray(self._pending_ids, dtype=np.int64),
+                                      np.asarray(self._pending_flags, dtype=bool)))
+            self._pending_ids, self._pending_flags = [], []
+        if self._pending_starts:
+            self._edge_chunks.append((np.asarray(self._pending_starts, dtype=np.int64),
+                                      np.asarray(self._pending_ends, dtype=np.int64)))
+            self._pending_starts, self._pending_ends = [], []
+
+    def build(self):
+        # Compact the pending nodes/edges into the CSR arrays. Existing edges keep
+        # their vehicle counts; calling build() again after more add_* calls merges.
+        if not self._dirty:
+            return self
+        old_sources = self.node_ids[np.repeat(np.arange(len(self.node_ids)), np.diff(self.offsets))]
+        old_targets = self.node_ids[self.targets]
+        old_vehicles = self.vehicles
+        old_q = self._q_value
+
+        self._flush_pending()
+
+        # Nodes: a repeated add_node keeps its first position but takes the latest flag.
+        ids = np.concatenate([self.node_ids] + [chunk[0] for chunk in self._node_chunks])
+        flags = np.concatenate([self.is_intersection] + [chunk[1] for chunk in self._node_chunks])
+        last = len(ids) - 1 - np.unique(ids[::-1], return_index=True)[1]
+        first = np.unique(ids, return_index=True)[1]
+        order = np.argsort(first, kind="stable")
+        self.node_ids = ids[first[order]]
+        self.is_intersection = flags[last[order]]
+        self._index_nodes()
+
+        # Edges: drop unknown endpoints, keep the first of any duplicates, then group by
+        # source with a stable sort so per-node edge order matches insertion order.
+        starts = np.concatenate([old_sources] + [chunk[0] for chunk in self._edge_chunks])
+        ends = np.concatenate([old_targets] + [chunk[1] for chunk in self._edge_chunks])
+        n_old = len(old_sources)
+        src = self._lookup(starts)
+        dst = self._lookup(ends)
+        keep = (src >= 0) & (dst >= 0)
+        keys = src.astype(np.int64) * max(len(self.node_ids), 1) + dst
+        keep_idx = np.flatnonzero(keep)
+        _, unique_idx = np.unique(keys[keep_idx], return_index=True)
+        keep_idx = np.sort(keep_idx[unique_idx])
+        keep_idx = keep_idx[np.argsort(src[keep_idx], kind="stable")]
+
+        self.targets = dst[keep_idx].astype(np.int32)
+        counts = np.bincount(src[keep_idx], minlength=len(self.node_ids))
+        self.offsets = np.zeros(len(self.node_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+        carried = keep_idx < n_old
+        self.vehicles = np.zeros(len(keep_idx), dtype=np.int32)
+        self.vehicles[carried] = old_vehicles[keep_idx[carried]]
+        if old_q is not None:
+            self._q_value = np.zeros(len(keep_idx), dtype=np.float64)
+            self._q_value[carried] = old_q[keep_idx[carried]]
+
+        self._node_chunks, self._edge_chunks = [], []
+        self._dirty = False
+        self.refresh_costs()
+        return self
+
+    @classmethod
+    def from_arrays(cls, node_ids, is_intersection, offsets, targets, vehicles=None,
+                    cost=None, sorted_pos=None, sorted_ids=None):
+        # Wrap already-compacted arrays (e.g. memory-mapped by network_io) without
+        # copying them. sorted_pos is argsort(node_ids) and sorted_ids is
+        # node_ids[sorted_pos]; they are computed when omitted.
+        graph = cls()
+        graph.node_ids = node_ids
+        graph.is_intersection = is_intersection
+        graph.offsets = offsets
+        graph.targets = targets
+        graph.vehicles = np.zeros(len(targets), dtype=np.int32) if vehicles is None else vehicles
+        graph._index_nodes(sorted_pos, sorted_ids)
+        if cost is None:
+            graph.refresh_costs()
+        else:
+            graph.cost = cost
+        return graph
+
+    def _index_nodes(self, sorted_pos=None, sorted_ids=None):
+        # Lookup tables for node id -> index.
+        if sorted_pos is None:
+            sorted_pos = np.argsort(self.node_ids, kind="stable")
+        self._sorted_pos = sorted_pos
+        self._sorted_ids = self.node_ids[sorted_pos] if sorted_ids is None else sorted_ids
+        # Ids forming one consecutive range (the usual case) are looked up by subtraction.
+        n = len(self._sorted_ids)
+        self._id_base = None
+        if n and self._sorted_ids[-1] - self._sorted_ids[0] == n - 1:
+            self._id_base = int(self._sorted_ids[0])
+        self._out = None  # The structure changed, so the scalar mirrors are stale.
+        self.__dict__.pop("nodes", None)
+
+    def _mirror(self):
+        # Node id -> {target id: edge index}, as Python ints, for O(1) scalar lookups.
+        if self._out is None:
+            ids = self.node_ids.tolist()
+            offsets = self.offsets.tolist()
+            targets = self.targets.tolist()
+            self._out = {id: {ids[targets[e]]: e for e in range(offsets[i], offsets[i + 1])}
+                         for i, id in enumerate(ids)}
+        return self._out
+
+    def __getstate__(self):
+        # The mirrors and views are rebuilt on demand, so they are not pickled.
+        state = self.__dict__.copy()
+        state.pop("nodes", None)
+        state["_out"] = None
+        return state
+
+    def _ensure_built(self):
+        if self._dirty:
+            self.build()
+
+    def _lookup(self, ids):
+        # Vectorized node id -> node index; unknown ids map to -1.
+        if isinstance(ids, (int, np.integer)):
+            return self._lookup_one(int(ids))
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(self._sorted_ids) == 0:
+            return np.full(ids.shape, -1, dtype=np.int64)
+        pos = np.searchsorted(self._sorted_ids, ids)
+        pos = np.minimum(pos, len(self._sorted_ids) - 1)
+        found = self._sorted_ids[pos] == ids
+        return np.where(found, self._sorted_pos[pos], -1)
+
+    def _lookup_one(self, id):
+        # Scalar fast path of _lookup, used on every hop by the solvers.
+        n = len(self._sorted_ids)
+        if self._id_base is not None:
+            i = id - self._id_base
+            return self._sorted_pos.item(i) if 0 <= i < n else -1
+        pos = int(self._sorted_ids.searchsorted(id))
+        if pos < n and self._sorted_ids.item(pos) == id:
+            return self._sorted_pos.item(pos)
+        return -1
+
+    # --- Array-level API ---
+
+    @property
+    def num_nodes(self):
+        self._ensure_built()
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        self._ensure_built()
+        return len(self.targets)
+
+    @property
+    def q_value(self):
+        self._ensure_built()
+        if self._q_value is None:
+            self._q_value = np.zeros(len(self.targets), dtype=np.float64)
+        return self._q_value
+
+    def index_of(self, id):
+        # Node id -> node index, or -1 when the node does not exist.
+        self._ensure_built()
+        return int(self._lookup(id))
+
+    def fingerprint(self):
+        # Hash of the network structure (nodes, flags, edges, edge order); saved Q-values
+        # are only valid for a graph with the same fingerprint.
+        self._ensure_built()
+        digest = hashlib.sha256()
+        for array, dtype in ((self.node_ids, np.int64), (self.is_intersection, np.bool_),
+                             (self.offsets, np.int64), (self.targets, np.int64)):
+            digest.update(np.ascontiguousarray(array, dtype=dtype).tobytes())
+        return digest.hexdigest()[:32]
+
+    def edge_sources(self):
+        # Source node index of every edge (the expanded form of offsets).
+        self._ensure_built()
+        return np.repeat(np.arange(len(self.node_ids), dtype=np.int32), np.diff(self.offsets))
+
+    def reverse_arrays(self):
+        # CSR of the reversed graph: (offsets, sources, edges) where
+        # sources[offsets[v]:offsets[v+1]] are the nodes with an edge into v and
+        # edges[...] the matching forward edge indices (to read their costs).
+        self._ensure_built()
+        edges = np.argsort(self.targets, kind="stable")
+        counts = np.bincount(self.targets, minlength=len(self.node_ids))
+        offsets = np.zeros(len(self.node_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return offsets, self.edge_sources()[edges], edges
+
+    def edge_index(self, start, end):
+        # Index of the edge between two node indices, or -1 when there is none.
+        lo, hi = int(self.offsets[start]), int(self.offsets[start + 1])
+        for e, target in enumerate(self.targets[lo:hi].tolist(), lo):
+            if target == end:
+                return e
+        return -1
+
+    def edge_between(self, start, end):
+        # Same as edge_index but takes node ids.
+        if self._dirty:
+            self.build()
+        return (self._out or self._mirror()).get(start, _NO_EDGES).get(end, -1)
+
+    def refresh_costs(self):
+        # Recompute every cached edge cost in one vectorized pass (after a rebuild or
+        # a bulk write to vehicles); the next take_changed_edges() returns every edge.
+        self.changed_edges = set()
+        self._all_changed = True
+        self.cost = (BASE_TIME
+                     + CONGESTION_FACTOR * self.vehicles
+                     + INTERSECTION_DELAY * self.is_intersection[self.targets])
+        return self.cost
+
+    def take_changed_edges(self):
+        # Sorted indices of the edges whose cost changed since the previous call.
+        if self._all_changed:
+            changed = np.arange(len(self.targets), dtype=np.int64)
+        else:
+            changed = np.fromiter(self.changed_edges, dtype=np.int64, count=len(self.changed_edges))
+            changed.sort()
+        self.changed_edges = set()
+        self._all_changed = False
+        return changed
+
+    def free_flow_cost(self):
+        # Travel time of every edge with no vehicles on it (base time plus the
+        # intersection delay), as a new float64 array.
+        self._ensure_built()
+        return BASE_TIME + INTERSECTION_DELAY * self.is_intersection[self.targets].astype(np.float64)
+
+    def edge_cost(self, e):
+        # Current travel time of edge index e, read from the cache.
+        return float(self.cost[e])
+
+    def enter_edge(self, e):
+        # A vehicle enters edge index e; its cached cost follows the new count.
+        self.vehicles[e] += 1
+        self._update_cost(e)
+
+    def exit_edge(self, e):
+        if self.vehicles[e] > 0:  # The count never goes below zero.
+            self.vehicles[e] -= 1
+        self._update_cost(e)
+
+    def _update_cost(self, e):
+        delay = INTERSECTION_DELAY if self.is_intersection[self.targets[e]] else 0
+        self.cost[e] = BASE_TIME + CONGESTION_FACTOR * int(self.vehicles[e]) + delay
+        self.changed_edges.add(e)
+
+    def travel_time(self, start, end):
+        # edge_between inlined: this is called on every hop by the solver scripts.
+        if self._dirty:
+            self.build()
+        e = (self._out or self._mirror()).get(start, _NO_EDGES).get(end, -1)
+        if e < 0:
+            return float('inf')
+        return self.cost.item(e)
+
+    # --- Compatibility views: graph.nodes[id].edges[end] ---
+
+    @cached_property
+    def nodes(self):
+        # Cached in the instance dict, so later reads are a plain attribute lookup;
+        # add_* calls and rebuilds drop it.
+        self._ensure_built()
+        return NodeMap(self)
+
+
+class NodeMap(dict):
+    # Node id -> NodeView, one view per node; a plain dict, so lookups run at dict speed.
+    __slots__ = ()
+
+    def __init__(self, graph):
+        flags = graph.is_intersection.tolist()
+        super().__init__((id, NodeView(graph, i, id, flags[i], edges))
+                         for i, (id, edges) in enumerate(graph._mirror().items()))
+
+
+class NodeView:
+    __slots__ = ("graph", "index", "id", "is_intersection", "edges")
+
+    def __init__(self, graph, index, id, is_intersection, edges):
+        self.graph = graph
+        self.index = index
+        self.id = id
+        self.is_intersection = is_intersection
+        self.edges = EdgeMap(graph, edges)
+
+
+class EdgeMap(dict):
+    # Target id -> EdgeView for the edges leaving one node.
+    __slots__ = ()
+
+    def __init__(self, graph, edges):
+        q = graph.q_value  # Allocated up front so the views can hold on to it.
+        super().__init__((end, EdgeView(graph, e, q)) for end, e in edges.items())
+
+
+class EdgeView:
+    # q is graph.q_value; build() allocates a new array, but it also replaces the views.
+    __slots__ = ("graph", "index", "q")
+
+    def __init__(self, graph, index, q):
+        self.graph = graph
+        self.index = index
+        self.q = q
+
+    @property
+    def vehicles(self):
+        return self.graph.vehicles.item(self.index)
+
+    @vehicles.setter
+    def vehicles(self, count):
+        self.graph.vehicles[self.index] = count
+        self.graph._update_cost(self.index)
+
+    @property
+    def q_value(self):
+        return self.q.item(self.index)
+
+    @q_value.setter
+    def q_value(self, value):
+        self.q[self.index] = value
+
+    def enter(self):
+        self.graph.enter_edge(self.index)  # A vehicle enters the edge.
+
+    def exit(self):
+        self.graph.exit_edge(self.index)  # A vehicle leaves the edge.
+
+
+def travel_time(graph, start, end):
+    # Array-backed equivalent of the per-module travel_time functions.
+    return graph.travel_time(start, end)
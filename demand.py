@@ -0,0 +1,67 @@
+# ----------------------
+# Streaming vehicle demand from trip logs
+# ----------------------
+# Trips are read lazily from CSV or JSON-lines files (optionally gzip-compressed) and
+# handed out one at a time or in fixed-size chunks, so memory stays flat no matter how
+# long the log is. A trip has a start node, a destination node and an optional
+# departure time; CSV files need a header naming the columns, e.g.
+#   start,destination,depart_time
+#   1,5,0.0
+# and JSON-lines files hold one {"start": 1, "destination": 5, "depart_time": 0.0}
+# object per line ("end" is accepted for "destination" in both formats).
+
+import csv
+import gzip
+import itertools
+import json
+
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+def _trip(record):
+    destination = record["destination"] if "destination" in record else record["end"]
+    depart_time = record.get("depart_time")
+    return (int(record["start"]), int(destination),
+            float(depart_time) if depart_time not in (None, "") else 0.0)
+
+
+def read_trips(path):
+    # Yields (start, destination, depart_time) tuples one line at a time.
+    jsonl = path.endswith((".jsonl", ".jsonl.gz", ".json", ".json.gz"))
+    with _open(path) as f:
+        if jsonl:
+            for line in f:
+                if line.strip():
+                    yield _trip(json.loads(line))
+        else:
+            for record in csv.DictReader(f):
+                yield _trip(record)
+
+
+def chunked(trips, chunk_size=10000):
+    # Groups any trip iterator into lists of at most chunk_size trips.
+    trips = iter(trips)
+    while True:
+        chunk = list(itertools.islice(trips, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_trip_chunks(path, chunk_size=10000):
+    return chunked(read_trips(path), chunk_size)
+
+
+def iter_vehicles(trips, vehicle_class):
+    # Turns trips (or a trip file path) into vehicles lazily. The departure time is
+    # stored as vehicle.start_time for simulators that release vehicles over time.
+    if isinstance(trips, str):
+        trips = read_trips(trips)
+    for start, destination, depart_time in trips:
+        vehicle = vehicle_class(start, destination)
+        vehicle.start_time = depart_time
+        yield vehicle
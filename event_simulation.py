@@ -0,0 +1,140 @@
+# ----------------------
+# Discrete-event traffic simulation with edge enter/exit events
+# ----------------------
+# Every vehicle is driven by events on one heap ordered by simulation time:
+#   DEPART (vehicle is at a node and picks its next edge; it enters the edge now)
+#   ARRIVE (vehicle reaches the end of the edge at its real arrival time and exits it)
+# Occupancy therefore only counts vehicles that are on an edge at the same time, and
+# finished vehicles are never looked at again: the cost is O(events log events).
+
+import heapq
+import itertools
+from time import perf_counter
+
+from csr_graph import INTERSECTION_DELAY
+from perf_stats import stats
+
+DEPART = 0
+ARRIVE = 1
+
+
+class EventSimulator:
+    def __init__(self, graph, choose_next, max_hops=None, reservations=None):
+        # choose_next(graph, current, destination) returns the next node id for a
+        # vehicle (or None when it cannot move), e.g. a greedy heuristic or Q-policy.
+        # reservations (an IntersectionReservations) enforces one vehicle per
+        # intersection: the intersection delay at the end of an edge becomes a booked
+        # crossing window, and a vehicle whose window is taken waits for the next free one.
+        self.graph = graph.build()
+        self.choose_next = choose_next
+        self.reservations = reservations
+        self.waiting_time = 0.0  # Total time vehicles spent waiting for intersections.
+        self.max_hops = 4 * graph.num_nodes if max_hops is None else max_hops
+        self.heap = []  # (time, sequence, vehicle number, event, edge index)
+        self.sequence = 0  # Tiebreak so equal-time events keep their scheduling order.
+        self.vehicles = {}  # Vehicles still travelling, by number; finished ones are dropped.
+        self.hops = {}
+        self.added = 0
+        self.reached = 0  # Vehicles that reached their destination.
+        self.total_time = 0.0  # Travel time of every vehicle that left the simulation.
+        self.now = 0.0
+        self.events = 0  # Events processed so far.
+        self.arrivals = iter(())  # Rest of the vehicle stream, kept across run() calls.
+        self.pending = None  # Next vehicle of the stream, not added yet.
+
+    def schedule(self, time, number, event, edge=-1):
+        heapq.heappush(self.heap, (time, self.sequence, number, event, edge))
+        self.sequence += 1
+
+    def add_vehicle(self, vehicle, start_time=0.0):
+        # The vehicle object needs current_node, destination and time attributes; time
+        # accumulates the travel time of every edge the vehicle takes.
+        number = self.added
+        self.added += 1
+        self.vehicles[number] = vehicle
+        self.hops[number] = 0
+        self.schedule(max(start_time, self.now), number, DEPART)
+        return number
+
+    def _retire(self, number, vehicle):
+        del self.vehicles[number]
+        del self.hops[number]
+        self.total_time += vehicle.time
+
+    def _book_crossing(self, node, arrival):
+        # Reserve the crossing that ends the edge ([arrival - delay, arrival) when the
+        # intersection is free); returns how long the vehicle has to wait for it.
+        reservations = self.reservations
+        reservations.forget_before(node, self.now)
+        wanted = arrival - INTERSECTION_DELAY
+        start = reservations.earliest_free(node, wanted, INTERSECTION_DELAY)
+        reservations.reserve(node, start, start + INTERSECTION_DELAY)
+        self.waiting_time += start - wanted
+        return start - wanted
+
+    def run(self, until=float('inf'), on_arrival=None, arrivals=None):
+        # Process events in time order; on_arrival(number, vehicle) is called once for
+        # every vehicle that reaches its destination. arrivals is an optional iterator of
+        # vehicles ordered by their start_time attribute (e.g. demand.iter_vehicles); each
+        # one is only pulled in when the clock reaches its departure, so a stream of any
+        # length is simulated with memory proportional to the vehicles on the road.
+        # Vehicles departing after `until` stay in the stream for a later run() call.
+        graph = self.graph
+        began, events, hops = perf_counter(), self.events, 0
+        if arrivals is not None:
+            self._extend_arrivals(arrivals)
+        pending, arrivals = self.pending, self.arrivals
+        while True:
+            while pending is not None and _start(pending) <= until and (not self.heap or _start(pending) <= self.heap[0][0]):
+                self.add_vehicle(pending, _start(pending))
+                pending = next(arrivals, None)
+            if not self.heap or self.heap[0][0] > until:
+                break
+            time, _, number, event, e = heapq.heappop(self.heap)
+            self.now = time
+            self.events += 1
+            vehicle = self.vehicles[number]
+
+            if event == ARRIVE:
+                graph.exit_edge(e)  # The vehicle leaves the edge at its real arrival time.
+                vehicle.current_node = int(graph.node_ids[graph.targets[e]])
+
+            if vehicle.current_node == vehicle.destination:
+                self.reached += 1
+                self._retire(number, vehicle)
+                if on_arrival is not None:
+                    on_arrival(number, vehicle)
+                continue
+            if self.hops[number] >= self.max_hops:
+                self._retire(number, vehicle)
+                continue  # Give up on vehicles that wander without reaching the goal.
+
+            next_node = self.choose_next(graph, vehicle.current_node, vehicle.destination)
+            e = graph.edge_between(vehicle.current_node, next_node) if next_node is not None else -1
+            if e < 0:
+                self._retire(number, vehicle)
+                continue  # Stuck: no edge to move along.
+            travel = float(graph.cost[e])  # Time for this edge given who is on it now.
+            if self.reservations is not None and graph.is_intersection[graph.targets[e]]:
+                travel += self._book_crossing(int(graph.targets[e]), time + travel)
+            graph.enter_edge(e)
+            vehicle.time += travel
+            self.hops[number] += 1
+            hops += 1
+            self.schedule(time + travel, number, ARRIVE, e)
+        stats.add_time("simulation", perf_counter() - began)
+        stats.count("events", self.events - events)
+        stats.count("hops", hops)
+        stats.rate_of("events", "simulation")
+        self.pending = pending
+        return self
+
+    def _extend_arrivals(self, arrivals):
+        # A new stream is merged by start_time with what is left of the previous one.
+        rest = itertools.chain([self.pending], self.arrivals) if self.pending is not None else self.arrivals
+        self.arrivals = heapq.merge(rest, arrivals, key=_start)
+        self.pending = next(self.arrivals, None)
+
+
+def _start(vehicle):
+    return getattr(vehicle, "start_time", 0.0)
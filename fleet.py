@@ -0,0 +1,181 @@
+# ----------------------
+# Struct-of-arrays vehicle fleet
+# ----------------------
+# One NumPy column per vehicle attribute instead of one Python object per vehicle:
+#   current[i], destination[i], origin[i] -> node indices (int32)
+#   time[i]                               -> accumulated travel time (float64)
+#   start_time[i]                         -> departure time (float64)
+#   status[i]                             -> WAITING / ACTIVE / ARRIVED / STUCK (int8)
+# That is 29 bytes per vehicle, so a million vehicles take about 29 MB, and moving all
+# active vehicles one hop is a handful of array operations. fleet[i] returns a small
+# __slots__ Vehicle view with the usual current_node/destination/time attributes, so
+# code written for lists of Vehicle objects keeps working on a Fleet.
+
+import numpy as np
+
+from batch_trainer import padded_edges
+from csr_graph import CONGESTION_FACTOR
+
+WAITING = 0  # Not departed yet (start_time in the future).
+ACTIVE = 1
+ARRIVED = 2
+STUCK = 3  # No outgoing edge to take.
+
+
+class Fleet:
+    def __init__(self, graph, starts, destinations, start_times=None):
+        # starts/destinations are node ids; start_times defaults to 0 for everyone.
+        self.graph = graph.build()
+        self.origin = graph._lookup(starts).astype(np.int32)
+        self.destination = graph._lookup(destinations).astype(np.int32)
+        if (self.origin < 0).any() or (self.destination < 0).any():
+            raise KeyError("start or destination node not in graph")
+        n = len(self.origin)
+        self.current = self.origin.copy()
+        self.time = np.zeros(n, dtype=np.float64)
+        self.start_time = np.zeros(n) if start_times is None else np.asarray(start_times, dtype=np.float64)
+        self.status = np.full(n, WAITING, dtype=np.int8)
+        self.hops = 0  # Vehicle moves made by step().
+
+    @classmethod
+    def from_trips(cls, graph, trips):
+        # trips of (start, destination) or (start, destination, depart_time), e.g. from
+        # demand.read_trips.
+        trips = list(trips)
+        return cls(graph, [trip[0] for trip in trips], [trip[1] for trip in trips],
+                   [trip[2] if len(trip) > 2 else 0.0 for trip in trips])
+
+    def __len__(self):
+        return len(self.current)
+
+    def __getitem__(self, i):
+        return Vehicle(self, i)
+
+    def __iter__(self):
+        return (Vehicle(self, i) for i in range(len(self)))
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in
+                   (self.origin, self.destination, self.current, self.time, self.start_time, self.status))
+
+    # --- Masks ---
+
+    def finished(self):
+        return self.status >= ARRIVED
+
+    def active(self):
+        return self.status == ACTIVE
+
+    def release(self, now):
+        # Vehicles whose departure time has come start driving; returns how many did.
+        departing = (self.status == WAITING) & (self.start_time <= now)
+        self.status[departing] = ACTIVE
+        self._arrive(np.flatnonzero(departing))
+        return int(departing.sum())
+
+    def _arrive(self, vehicles):
+        at_goal = vehicles[self.current[vehicles] == self.destination[vehicles]]
+        self.status[at_goal] = ARRIVED
+
+    # --- Movement ---
+
+    def step(self, policy, now=None):
+        # Move every active vehicle one hop. policy(fleet, vehicle indices) returns the
+        # edge index each of them takes (-1 when it cannot move). Vehicles sharing an
+        # edge in the same step slow each other down by CONGESTION_FACTOR each, on top
+        # of the graph's current cached edge cost. Returns the number of vehicles moved.
+        if now is not None:
+            self.release(now)
+        moving = np.flatnonzero(self.status == ACTIVE)
+        if len(moving) == 0:
+            return 0
+        edges = np.asarray(policy(self, moving), dtype=np.int64)
+        stuck = edges < 0
+        self.status[moving[stuck]] = STUCK
+        moving, edges = moving[~stuck], edges[~stuck]
+        sharing = np.bincount(edges, minlength=self.graph.num_edges)[edges] - 1
+        self.time[moving] += self.graph.cost[edges] + CONGESTION_FACTOR * sharing
+        self.current[moving] = self.graph.targets[edges]
+        self._arrive(moving)
+        self.hops += len(moving)
+        return len(moving)
+
+    def run(self, policy, max_steps=None):
+        # Release everyone and step until all vehicles are finished (or max_steps).
+        max_steps = 4 * self.graph.num_nodes if max_steps is None else max_steps
+        self.release(float('inf'))
+        steps = 0
+        while steps < max_steps and self.step(policy):
+            steps += 1
+        return steps
+
+    def total_time(self):
+        return float(self.time[self.status == ARRIVED].sum())
+
+
+def q_policy(graph, q):
+    # Greedy policy over a per-edge Q array (see batch_trainer): each vehicle takes the
+    # highest-Q edge out of its current node.
+    edges, _ = padded_edges(graph)
+
+    def choose(fleet, vehicles):
+        options = edges[fleet.current[vehicles]]
+        best = np.where(options >= 0, q[np.maximum(options, 0)], -np.inf).argmax(axis=1)
+        return np.take_along_axis(options, best[:, None], axis=1)[:, 0]
+    return choose
+
+
+def times_policy(graph, times, destination_indices):
+    # Shortest-time policy from an all_pairs.travel_time_matrix result: each vehicle
+    # takes the edge minimising edge cost plus the remaining time to its destination.
+    edges, _ = padded_edges(graph)
+    row_of = np.full(graph.num_nodes, -1, dtype=np.int64)
+    row_of[np.asarray(destination_indices)] = np.arange(len(destination_indices))
+
+    def choose(fleet, vehicles):
+        options = edges[fleet.current[vehicles]]
+        safe = np.maximum(options, 0)
+        rows = row_of[fleet.destination[vehicles]][:, None]
+        score = np.where(options >= 0, graph.cost[safe] + times[rows, graph.targets[safe]], np.inf)
+        best = score.argmin(axis=1)
+        chosen = np.take_along_axis(options, best[:, None], axis=1)[:, 0]
+        return np.where(np.isfinite(score.min(axis=1)), chosen, -1)
+    return choose
+
+
+class Vehicle:
+    # View of one fleet row with the attribute names the solver scripts use.
+    __slots__ = ("fleet", "index")
+
+    def __init__(self, fleet, index):
+        self.fleet = fleet
+        self.index = index
+
+    @property
+    def current_node(self):
+        return int(self.fleet.graph.node_ids[self.fleet.current[self.index]])
+
+    @current_node.setter
+    def current_node(self, id):
+        self.fleet.current[self.index] = self.fleet.graph.index_of(id)
+
+    @property
+    def destination(self):
+        return int(self.fleet.graph.node_ids[self.fleet.destination[self.index]])
+
+    @property
+    def time(self):
+        return float(self.fleet.time[self.index])
+
+    @time.setter
+    def time(self, value):
+        self.fleet.time[self.index] = value
+
+    @property
+    def start_time(self):
+        return float(self.fleet.start_time[self.index])
+
+    @property
+    def status(self):
+        return int(self.fleet.status[self.index])
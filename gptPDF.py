@@ -1,6 +1,8 @@
 import numpy as np
 import itertools
 
+from convergence import ConvergenceMonitor
+
 # Constants from BNART
 TRoad = 1  # Time taken to traverse a segment without congestion
 TDelay = 3  # Time delay at intersections
@@ -30,6 +32,7 @@ class Graph:
 
 class Vehicle:
     def __init__(self, start, end):
+        self.start = start
         self.current = start
         self.destination = end
         self.total_time = 0
@@ -43,7 +46,7 @@ def calculate_congestion_delay(vehicles):
     return C_percent * vehicles
 
 def update_q_value(graph, start, end, reward, alpha=0.1, gamma=0.9):
-    max_q = max(graph.nodes[end].edges[e]['q_value'] for e in graph.nodes[end].edges)
+    max_q = max((graph.nodes[end].edges[e]['q_value'] for e in graph.nodes[end].edges), default=0)
     sample = reward + gamma * max_q
     graph.nodes[start].edges[end]['q_value'] += alpha * (sample - graph.nodes[start].edges[end]['q_value'])
 
@@ -53,9 +56,23 @@ def get_next_node(graph, vehicle):
     next_node = max(possible_moves, key=lambda x: current_node.edges[x]['q_value'])
     return next_node
 
-def simulate(graph, vehicle, epochs=1000):
+def q_values(graph):
+    # Snapshot of every edge's Q-value keyed by (start, end).
+    return {(start, end): edge['q_value'] for start, node in graph.nodes.items() for end, edge in node.edges.items()}
+
+# Every epoch drives the vehicle from its start to its destination again; stops once the
+# Q-values move less than tolerance for `patience` epochs in a row and returns the number
+# of epochs actually run. The vehicle keeps the path and time of the last epoch
+def simulate(graph, vehicle, epochs=1000, tolerance=1e-6, patience=5):
+    monitor = ConvergenceMonitor(tolerance, patience)
     for _ in range(epochs):
+        before = q_values(graph)
+        vehicle.current = vehicle.start
+        vehicle.total_time = 0
+        vehicle.path = [vehicle.start]
+        updates = 0
         while vehicle.current != vehicle.destination:
+            previous = vehicle.current
             next_node = get_next_node(graph, vehicle)
             current_edge = graph.nodes[vehicle.current].edges[next_node]
             congestion_delay = calculate_congestion_delay(current_edge['vehicles'])
@@ -70,11 +87,14 @@ def simulate(graph, vehicle, epochs=1000):
             current_edge['vehicles'] += 1
 
             reward = -travel_time
-            update_q_value(graph, vehicle.current, next_node, reward)
+            update_q_value(graph, previous, next_node, reward)
+            updates += 1
 
             current_edge['vehicles'] -= 1
 
-        vehicle.move_to(vehicle.destination)
+        if monitor.observe_dict(before, q_values(graph), updates):
+            break
+    return monitor.episodes
 
 # Initialize Graph with Nodes and Edges as per BNART setup
 graph = Graph()
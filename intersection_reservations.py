@@ -0,0 +1,74 @@
+# ----------------------
+# Intersection reservations: one vehicle per intersection at a time
+# ----------------------
+# Every intersection node keeps the time windows it is booked for as two sorted lists
+# (window starts and ends). Windows never overlap, and back-to-back windows are merged
+# into one block, so:
+#   is_free(node, start, end)         - one binary search, O(log n)
+#   earliest_free(node, time, length) - binary search, then only skips gaps that are
+#                                       too short for the requested window
+#   reserve(node, start, end)         - binary search plus a list insert
+# Windows that ended before the simulation clock can be dropped with forget_before, so
+# the lists only hold upcoming bookings.
+
+from bisect import bisect_right
+
+
+class IntersectionReservations:
+    def __init__(self):
+        self.starts = {}  # node -> sorted window starts
+        self.ends = {}  # node -> matching window ends
+
+    def _lists(self, node):
+        if node not in self.starts:
+            self.starts[node] = []
+            self.ends[node] = []
+        return self.starts[node], self.ends[node]
+
+    def is_free(self, node, start, end):
+        # True when no booked window of node overlaps [start, end).
+        starts, ends = self.starts.get(node, ()), self.ends.get(node, ())
+        i = bisect_right(starts, start)
+        if i > 0 and ends[i - 1] > start:
+            return False  # The window starting before us is still running.
+        return i == len(starts) or starts[i] >= end
+
+    def earliest_free(self, node, time, length):
+        # Earliest start >= time of a free window of the given length at node.
+        starts, ends = self.starts.get(node, ()), self.ends.get(node, ())
+        i = bisect_right(starts, time)
+        if i > 0 and ends[i - 1] > time:
+            time = ends[i - 1]  # Wait for the window in progress.
+        while i < len(starts) and starts[i] < time + length:
+            time = max(time, ends[i])  # Gap before the next window is too short.
+            i += 1
+        return time
+
+    def reserve(self, node, start, end):
+        # Book [start, end) at node; raises ValueError when it is already taken.
+        if not self.is_free(node, start, end):
+            raise ValueError(f"intersection {node} is already reserved during [{start}, {end})")
+        starts, ends = self._lists(node)
+        i = bisect_right(starts, start)
+        joins_before = i > 0 and ends[i - 1] == start
+        joins_after = i < len(starts) and starts[i] == end
+        if joins_before and joins_after:
+            ends[i - 1] = ends[i]
+            del starts[i], ends[i]
+        elif joins_before:
+            ends[i - 1] = end
+        elif joins_after:
+            starts[i] = start
+        else:
+            starts.insert(i, start)
+            ends.insert(i, end)
+
+    def forget_before(self, node, time):
+        # Drop the windows of node that ended at or before time.
+        if node in self.ends:
+            i = bisect_right(self.ends[node], time)
+            if i:
+                del self.starts[node][:i], self.ends[node][:i]
+
+    def bookings(self, node):
+        return list(zip(self.starts.get(node, ()), self.ends.get(node, ())))
@@ -0,0 +1,58 @@
+# ----------------------
+# Landmark (ALT) lower bounds for A* and greedy search
+# ----------------------
+# A few landmark nodes are picked far apart and the free-flow travel time (base time
+# plus intersection delay, no congestion) from and to every node is precomputed for
+# each. By the triangle inequality
+#   h(v, t) = max over landmarks L of  d(L, t) - d(L, v)  and  d(v, L) - d(t, L)
+# never overestimates the time from v to t. Congestion only adds time, so the bound
+# stays admissible for the live costs too.
+
+import numpy as np
+
+from routing import shortest_times
+
+
+class Landmarks:
+    def __init__(self, graph, count=8, seed=0):
+        self.graph = graph.build()
+        n = graph.num_nodes
+        free_flow = graph.free_flow_cost()
+        count = min(count, n)
+        self.nodes = []  # Landmark node indices.
+        self.from_landmark = np.zeros((count, n), dtype=np.float32)  # d(L, v)
+        self.to_landmark = np.zeros((count, n), dtype=np.float32)  # d(v, L)
+
+        # Farthest-point selection: each new landmark is the node farthest (in the
+        # reachable part) from the ones picked so far.
+        rng = np.random.default_rng(seed)
+        spread = np.full(n, np.inf)
+        candidate = int(rng.integers(n)) if n else 0
+        for k in range(count):
+            self.nodes.append(candidate)
+            forward = shortest_times(graph, candidate, free_flow)
+            backward = shortest_times(graph, candidate, free_flow, reverse=True)
+            self.from_landmark[k] = forward
+            self.to_landmark[k] = backward
+            reach = np.where(np.isfinite(forward), forward, 0) + np.where(np.isfinite(backward), backward, 0)
+            spread = np.minimum(spread, reach)
+            spread[self.nodes] = -1
+            candidate = int(np.argmax(spread))
+        # float32 rounding could push a bound slightly above the true time.
+        self.slack = 1 - 1e-6
+
+    def bounds(self, nodes, goal):
+        # Lower bounds on the time from each node index in nodes to goal (vectorized).
+        with np.errstate(invalid="ignore"):
+            ahead = self.from_landmark[:, goal, None] - self.from_landmark[:, nodes]
+            behind = self.to_landmark[:, nodes] - self.to_landmark[:, goal, None]
+            best = np.fmax(np.nanmax(np.fmax(ahead, behind), axis=0, initial=0.0), 0.0)
+        return best * self.slack
+
+    def __call__(self, node, goal):
+        # heuristic(node_index, goal_index) for routing.astar.
+        return float(self.bounds(np.array([node]), goal)[0])
+
+    def estimate(self, current, goal):
+        # Same bound taking node ids, in place of the old heuristic_cost_estimate.
+        return self(self.graph.index_of(current), self.graph.index_of(goal))
@@ -0,0 +1,82 @@
+# ----------------------
+# Memory-mapped binary network format
+# ----------------------
+# A saved network is one file: an 8-byte magic, an 8-byte header length, a JSON header
+# describing each array (dtype, shape, byte offset), then the raw arrays, each aligned
+# to 64 bytes. Loading maps the file with np.memmap, so it costs O(1) whatever the
+# network size. Every worker process that loads the same file shares its pages through
+# the OS page cache. The structure arrays are mapped read-only; vehicles and cost are
+# mapped copy-on-write, so each process can simulate traffic on its own private copy of
+# only the pages it touches.
+
+import json
+import struct
+
+import numpy as np
+
+from csr_graph import CSRGraph
+
+MAGIC = b"CSRNET01"
+ALIGN = 64
+STRUCTURE = ["node_ids", "is_intersection", "offsets", "targets", "sorted_pos", "sorted_ids"]
+STATE = ["vehicles", "cost"]
+
+
+def _aligned(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def save_network(graph, path):
+    graph.build()
+    arrays = {
+        "node_ids": graph.node_ids,
+        "is_intersection": graph.is_intersection,
+        "offsets": graph.offsets,
+        "targets": graph.targets,
+        "sorted_pos": graph._sorted_pos,
+        "sorted_ids": graph._sorted_ids,
+        "vehicles": graph.vehicles,
+        "cost": graph.cost,
+    }
+    layout = {}
+    header = {"num_nodes": int(graph.num_nodes), "num_edges": int(graph.num_edges), "arrays": layout}
+    # Offsets depend on the header size, so size the header with placeholder offsets first.
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": 0}
+    header_size = _aligned(16 + len(json.dumps(header)) + 32 * len(arrays))
+    position = header_size
+    for name, array in arrays.items():
+        layout[name]["offset"] = position
+        position = _aligned(position + array.nbytes)
+    encoded = json.dumps(header).encode()
+    if 16 + len(encoded) > header_size:
+        raise ValueError("network header does not fit")  # Offsets grew past the estimate.
+
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(encoded)) + encoded)
+        for name, array in arrays.items():
+            f.seek(layout[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(position)
+
+
+def load_network(path):
+    with open(path, "rb") as f:
+        if f.read(8) != MAGIC:
+            raise ValueError(f"{path} is not a saved network")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length))
+
+    def mapped(name, mode):
+        spec = header["arrays"][name]
+        shape = tuple(spec["shape"])
+        if 0 in shape:
+            return np.zeros(shape, dtype=np.dtype(spec["dtype"]))  # mmap cannot map 0 bytes.
+        return np.memmap(path, dtype=np.dtype(spec["dtype"]), mode=mode, offset=spec["offset"], shape=shape)
+
+    structure = {name: mapped(name, "r") for name in STRUCTURE}
+    state = {name: mapped(name, "c") for name in STATE}
+    return CSRGraph.from_arrays(structure["node_ids"], structure["is_intersection"],
+                                structure["offsets"], structure["targets"],
+                                vehicles=state["vehicles"], cost=state["cost"],
+                                sorted_pos=structure["sorted_pos"], sorted_ids=structure["sorted_ids"])
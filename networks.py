@@ -0,0 +1,78 @@
+# ----------------------
+# Reproducible synthetic road networks and vehicle demand
+# ----------------------
+# Every generator takes a seed and returns a CSRGraph whose node ids are 0..n-1, so
+# the same arguments always give the same network. intersection_density is the
+# fraction of nodes flagged as intersections (3s delay on every edge into them).
+
+import numpy as np
+
+from csr_graph import CSRGraph
+
+
+def _build(num_nodes, starts, ends, intersection_density, rng, bidirectional=True):
+    graph = CSRGraph()
+    graph.add_nodes_from(np.arange(num_nodes), rng.random(num_nodes) < intersection_density)
+    graph.add_edges_from(starts, ends, bidirectional=bidirectional)
+    return graph.build()
+
+
+def grid_network(rows, cols, intersection_density=0.2, seed=0):
+    # Manhattan grid with two-way streets between horizontal/vertical neighbours.
+    rng = np.random.default_rng(seed)
+    ids = np.arange(rows * cols).reshape(rows, cols)
+    starts = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    ends = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    return _build(rows * cols, starts, ends, intersection_density, rng)
+
+
+def ring_network(rings, spokes, intersection_density=0.2, seed=0):
+    # Concentric ring roads joined by radial spokes; node id = ring * spokes + angle.
+    rng = np.random.default_rng(seed)
+    ids = np.arange(rings * spokes).reshape(rings, spokes)
+    around = np.roll(ids, -1, axis=1)
+    starts = np.concatenate([ids.ravel(), ids[:-1, :].ravel()])
+    ends = np.concatenate([around.ravel(), ids[1:, :].ravel()])
+    return _build(rings * spokes, starts, ends, intersection_density, rng)
+
+
+def random_geometric_network(num_nodes, radius=None, intersection_density=0.2, seed=0):
+    # Nodes scattered in the unit square, two-way roads between nodes closer than
+    # radius (default: about 6 neighbours per node). Pairs are found by bucketing the
+    # points into radius-sized cells and only comparing neighbouring cells.
+    rng = np.random.default_rng(seed)
+    if radius is None:
+        radius = np.sqrt(6.0 / (np.pi * max(num_nodes, 1)))
+    points = rng.random((num_nodes, 2))
+    cells_per_side = max(int(1 / radius), 1)
+    cell_xy = np.minimum((points / radius).astype(np.int64), cells_per_side - 1)
+    cell = cell_xy[:, 0] * cells_per_side + cell_xy[:, 1]
+    order = np.argsort(cell, kind="stable")
+    sorted_cells = cell[order]
+
+    starts, ends = [], []
+    # Half of the neighbourhood is enough: every pair is then seen exactly once.
+    for dx, dy in [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]:
+        nx, ny = cell_xy[:, 0] + dx, cell_xy[:, 1] + dy
+        inside = (nx >= 0) & (nx < cells_per_side) & (ny >= 0) & (ny < cells_per_side)
+        neighbour = nx * cells_per_side + ny
+        lo = np.searchsorted(sorted_cells, neighbour, side="left")
+        hi = np.searchsorted(sorted_cells, neighbour, side="right")
+        counts = np.where(inside, hi - lo, 0)
+        i = np.repeat(np.arange(num_nodes), counts)
+        j = order[np.repeat(lo, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)]
+        close = np.sum((points[i] - points[j]) ** 2, axis=1) <= radius ** 2
+        pair = close & ((i < j) if (dx, dy) == (0, 0) else (i != j))
+        starts.append(i[pair])
+        ends.append(j[pair])
+    return _build(num_nodes, np.concatenate(starts), np.concatenate(ends), intersection_density, rng)
+
+
+def random_demand(graph, vehicles, seed=0):
+    # (start, destination) node id pairs drawn uniformly, with start != destination.
+    rng = np.random.default_rng(seed)
+    n = graph.num_nodes
+    starts = rng.integers(0, n, vehicles)
+    shift = rng.integers(1, max(n, 2), vehicles)
+    ends = (starts + shift) % n
+    return list(zip(graph.node_ids[starts].tolist(), graph.node_ids[ends].tolist()))
@@ -0,0 +1,95 @@
+# ----------------------
+# Parallel Q-learning over scenarios and random seeds
+# ----------------------
+# Each job is one (scenario, seed) pair. Jobs are fanned out over a process pool,
+# each worker gets its own independent RNG stream spawned from one root seed, and
+# the learned per-edge Q arrays plus their metrics come back as one result list.
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_trainer import BatchTrainer, greedy_route
+from csr_graph import CSRGraph
+
+
+class Scenario:
+    def __init__(self, name, graph, vehicles, episodes=100, learning_rate=0.5,
+                 discount_factor=0.9, epsilon=0.1):
+        self.name = name
+        self.graph = graph  # CSRGraph; pickled into each worker.
+        self.vehicles = vehicles  # List of (start, destination) node ids.
+        self.episodes = episodes
+        self.learning_rate = learning_rate
+        self.discount_factor = discount_factor
+        self.epsilon = epsilon
+
+
+def evaluate(graph, q, vehicles):
+    # Total travel time when every vehicle follows the greedy policy.
+    return sum(greedy_route(graph, q, start, end)[1] for start, end in vehicles)
+
+
+def train_job(scenario, seed_index, seed_sequence):
+    # Worker entry point: train one scenario with one RNG stream.
+    rng = np.random.default_rng(seed_sequence)
+    graph = scenario.graph.build()
+    q = np.zeros(graph.num_edges, dtype=np.float64)
+    starts = [start for start, _ in scenario.vehicles]
+    destinations = [end for _, end in scenario.vehicles]
+    began = time.perf_counter()
+    trainer = BatchTrainer(graph, starts, destinations, scenario.learning_rate,
+                           scenario.discount_factor, scenario.epsilon, q=q, rng=rng)
+    trainer.train(scenario.episodes)
+    elapsed = time.perf_counter() - began
+    return {
+        "scenario": scenario.name,
+        "seed_index": seed_index,
+        "q": q,
+        "metrics": {
+            "total_time": evaluate(graph, q, scenario.vehicles),
+            "transitions": trainer.transitions,
+            "episodes": trainer.episodes,
+            "seconds": elapsed,
+        },
+    }
+
+
+def train_parallel(scenarios, seeds=4, root_seed=0, max_workers=None):
+    # Train every scenario with `seeds` independent RNG streams; returns all results.
+    streams = np.random.SeedSequence(root_seed).spawn(len(scenarios) * seeds)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(train_job, scenario, k, streams[i * seeds + k])
+                   for i, scenario in enumerate(scenarios) for k in range(seeds)]
+        return [future.result() for future in futures]
+
+
+def best_per_scenario(results):
+    # Keep the seed with the lowest greedy total travel time for each scenario.
+    best = {}
+    for result in results:
+        current = best.get(result["scenario"])
+        if current is None or result["metrics"]["total_time"] < current["metrics"]["total_time"]:
+            best[result["scenario"]] = result
+    return best
+
+
+def main():
+    graph = CSRGraph()
+    for i in range(1, 7):
+        graph.add_node(i, i == 1 or i == 6 or i == 3)  # Nodes 1, 6, and 3 are intersections.
+    for start, end in [(1, 2), (2, 3), (3, 4), (3, 5), (4, 5), (5, 6), (6, 1)]:
+        graph.add_edge(start, end)
+
+    scenarios = [
+        Scenario("morning", graph, [(1, 5), (5, 1), (3, 5)]),
+        Scenario("evening", graph, [(5, 1), (1, 5)], epsilon=0.2),
+    ]
+    results = train_parallel(scenarios, seeds=4)
+    for name, result in best_per_scenario(results).items():
+        print(f"Scenario {name}: best seed {result['seed_index']} with metrics {result['metrics']}")
+
+
+if __name__ == "__main__":
+    main()
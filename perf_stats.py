@@ -0,0 +1,74 @@
+# ----------------------
+# Performance counters and per-phase timers
+# ----------------------
+# One shared Stats object (perf_stats.stats) collects, for the current run:
+#   counters - hops, q_updates, nodes_expanded, paths_scored, ...
+#   phases   - wall-clock seconds and number of calls per named phase
+# Hot loops add to a local variable and report once per call (stats.count(name, n)),
+# so the instrumentation is a few dict operations per search/step and can stay on.
+# as_dict()/to_json() export everything plus rates such as hops per second of the
+# phase that produced them.
+#
+#   with stats.phase("training"):
+#       ...
+#   stats.count("hops", n)
+#   print(stats.to_json())
+
+import json
+import time
+from contextlib import contextmanager
+
+
+class Stats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counters = {}
+        self.seconds = {}
+        self.calls = {}
+        self.rate_phases = {}  # counter -> phase its rate is measured against
+        self.started = time.perf_counter()
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, phase, seconds, calls=1):
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + calls
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def rate_of(self, counter, phase):
+        # Report counter per second of phase (instead of per second of the whole run).
+        self.rate_phases[counter] = phase
+
+    def as_dict(self):
+        elapsed = time.perf_counter() - self.started
+        rates = {}
+        for name, value in self.counters.items():
+            seconds = self.seconds.get(self.rate_phases.get(name), elapsed)
+            rates[f"{name}_per_second"] = value / seconds if seconds > 0 else 0.0
+        return {
+            "elapsed": elapsed,
+            "counters": dict(self.counters),
+            "phases": {name: {"seconds": self.seconds[name], "calls": self.calls[name]}
+                       for name in self.seconds},
+            "rates": rates,
+        }
+
+    def to_json(self, path=None):
+        text = json.dumps(self.as_dict(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+        return text
+
+
+stats = Stats()  # Shared by routing, the trainers, the simulator and the solver scripts.
@@ -0,0 +1,98 @@
+# ----------------------
+# Q-value checkpoints and warm starts
+# ----------------------
+# Trained Q-values (the per-edge graph.q_value array or a QTable) are saved as one file:
+# an 8-byte magic, an 8-byte header length, a JSON header (graph fingerprint, dtype,
+# shape, destinations, training progress) and the raw array. Writes go to a temporary
+# file that is renamed over the old checkpoint, so a crash mid-save never leaves a
+# half-written file behind. Loading checks the fingerprint, so Q-values are never
+# applied to a network whose nodes or edges differ from the one they were trained on.
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from q_table import QTable
+
+MAGIC = b"QVALUE01"
+
+
+def save_q(path, graph, values, destinations=None, progress=None):
+    # values is the per-edge Q array or QTable.values; progress is any JSON-able dict
+    # (e.g. {"episodes": 500}) returned again by load_q.
+    values = np.ascontiguousarray(values)
+    header = {
+        "fingerprint": graph.fingerprint(),
+        "dtype": values.dtype.str,
+        "shape": list(values.shape),
+        "destinations": None if destinations is None else [int(d) for d in destinations],
+        "progress": progress or {},
+    }
+    encoded = json.dumps(header).encode()
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(encoded)) + encoded)
+        f.write(values.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_q(path, graph):
+    # Returns (values, header); raises ValueError when the file does not belong to graph.
+    with open(path, "rb") as f:
+        if f.read(8) != MAGIC:
+            raise ValueError(f"{path} is not a Q-value checkpoint")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length))
+        if header["fingerprint"] != graph.fingerprint():
+            raise ValueError(f"{path} was trained on a different network")
+        values = np.frombuffer(f.read(), dtype=np.dtype(header["dtype"])).reshape(header["shape"]).copy()
+    return values, header
+
+
+def warm_start(path, graph, q=None):
+    # Load saved per-edge Q-values into q (default graph.q_value) if path exists.
+    # Returns the saved progress dict, or None when training has to start from zero.
+    if not os.path.exists(path):
+        return None
+    values, header = load_q(path, graph)
+    q = graph.q_value if q is None else q
+    q[:] = values
+    return header["progress"]
+
+
+def save_q_table(path, q_table, progress=None):
+    save_q(path, q_table.graph, q_table.values, q_table.destinations, progress)
+
+
+def load_q_table(path, graph):
+    values, header = load_q(path, graph)
+    q_table = QTable(graph, header["destinations"], dtype=values.dtype)
+    if q_table.values.shape != values.shape:
+        raise ValueError(f"{path} does not match the Q-table layout")
+    q_table.values[:] = values
+    return q_table
+
+
+class Checkpointer:
+    # Saves a per-edge Q array every `every` episodes during a long training run.
+    # Pass it as checkpoint= to BatchTrainer.train or A2_QLearning.q_learning_simulation.
+    # done is the episode count already in the Q-values (from warm_start), so a resumed
+    # run keeps counting where the previous one stopped.
+    def __init__(self, path, graph, every=100, done=0):
+        self.path = path
+        self.graph = graph
+        self.every = every
+        self.done = done
+        self.last = 0
+
+    def __call__(self, episodes, q):
+        if episodes - self.last >= self.every:
+            self.save(episodes, q)
+
+    def save(self, episodes, q):
+        save_q(self.path, self.graph, q, progress={"episodes": int(self.done + episodes)})
+        self.last = episodes
@@ -0,0 +1,72 @@
+# ----------------------
+# Dense Q-table indexed by (node, destination, outgoing-edge slot)
+# ----------------------
+# values[i, d, k] is the Q-value of taking the k-th outgoing edge of node index i
+# while heading to the d-th destination. Slots past a node's out-degree are padding
+# and hold -inf, so max/argmax over the last axis only ever see real actions.
+
+import numpy as np
+
+
+class QTable:
+    def __init__(self, graph, destinations, dtype=np.float64):
+        self.graph = graph.build()
+        # Destination node id -> row along the second axis (duplicates share a row).
+        self.destinations = list(dict.fromkeys(destinations))
+        self.dest_index = {dest: d for d, dest in enumerate(self.destinations)}
+
+        self.degree = np.diff(graph.offsets)
+        self.max_degree = max(int(self.degree.max()) if len(self.degree) else 0, 1)
+        self.valid = np.arange(self.max_degree) < self.degree[:, None]  # (nodes, slots)
+        self.values = np.zeros((graph.num_nodes, len(self.destinations), self.max_degree), dtype=dtype)
+        self.values[:] = np.where(self.valid[:, None, :], 0.0, -np.inf)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.valid.nbytes
+
+    # --- Vectorized operations on node indices / destination rows / slots ---
+
+    def max_values(self, nodes, dests):
+        # max_a Q(node, dest, a); nodes without outgoing edges are worth 0.
+        best = self.values[nodes, dests].max(axis=-1)
+        return np.where(self.degree[nodes] > 0, best, 0.0)
+
+    def best_slots(self, nodes, dests):
+        return self.values[nodes, dests].argmax(axis=-1)
+
+    def next_nodes(self, nodes, slots):
+        # Node index reached by taking the given slot at the given node.
+        return self.graph.targets[self.graph.offsets[nodes] + slots]
+
+    def choose_slots(self, nodes, dests, epsilon, rng):
+        # Epsilon-greedy: a uniformly random valid slot with probability epsilon.
+        nodes = np.asarray(nodes)
+        greedy = self.best_slots(nodes, dests)
+        random_slots = (rng.random(nodes.shape) * self.degree[nodes]).astype(np.int64)
+        explore = rng.random(nodes.shape) < epsilon
+        return np.where(explore, random_slots, greedy)
+
+    def update(self, nodes, dests, slots, rewards, next_nodes, alpha, gamma):
+        # Bellman update Q <- (1 - alpha) * Q + alpha * (reward + gamma * max_a' Q(next, a')).
+        target = rewards + gamma * self.max_values(next_nodes, dests)
+        current = self.values[nodes, dests, slots]
+        self.values[nodes, dests, slots] = (1 - alpha) * current + alpha * target
+
+    # --- Scalar helpers taking node ids, as the solvers use them ---
+
+    def slot_of(self, node, next_node):
+        # Slot of the edge node -> next_node, or -1 when the edge does not exist.
+        e = self.graph.edge_between(node, next_node)
+        if e < 0:
+            return -1
+        return e - int(self.graph.offsets[self.graph.index_of(node)])
+
+    def choose(self, node, destination, epsilon, rng=np.random):
+        # Returns the next node id, or None when node has no outgoing edges.
+        i = self.graph.index_of(node)
+        if i < 0 or self.degree[i] == 0:
+            return None
+        d = self.dest_index[destination]
+        slot = self.choose_slots(np.array([i]), d, epsilon, rng)[0]
+        return int(self.graph.node_ids[self.next_nodes(i, slot)])
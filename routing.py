@@ -0,0 +1,193 @@
+# ----------------------
+# Congestion-aware shortest paths (Dijkstra / A*) over a CSRGraph
+# ----------------------
+# Edge weights are the graph's cached travel times (base + 0.01*vehicles + intersection
+# delay), so the best path and its time match what find_all_paths + calculate_path_time
+# produced, in O(E log V) instead of enumerating every simple path.
+
+import heapq
+import itertools
+
+import numpy as np
+
+from perf_stats import stats
+
+
+def zero_heuristic(node, goal):
+    # A* with a zero heuristic is plain Dijkstra.
+    return 0
+
+
+def astar(graph, start, end, heuristic=zero_heuristic, weights=None):
+    # Returns (path, time) between two node ids; (None, inf) when end is unreachable.
+    # heuristic(node_index, goal_index) must never overestimate the remaining time.
+    # weights overrides the per-edge costs (defaults to graph.cost).
+    source, target = graph.index_of(start), graph.index_of(end)
+    if source < 0 or target < 0:
+        return None, float('inf')
+    edges, time = search_edges(graph, source, target, weights, heuristic)
+    if edges is None:
+        return None, float('inf')
+    return edges_to_path(graph, source, edges), time
+
+
+def search_edges(graph, source, target, weights=None, heuristic=zero_heuristic):
+    # Same search over node indices for callers that work with edges (loads, bookings):
+    # returns (edge index list, time) or (None, inf); see edges_to_path for the ids.
+    return _search(graph, source, target, heuristic, graph.cost if weights is None else weights)
+
+
+def _search(graph, source, target, heuristic, cost, blocked_nodes=(), blocked_edges=()):
+    # A* over node indices. Returns (edge index list, time) or (None, inf).
+    # blocked_nodes/blocked_edges are skipped, which is how Yen's spur searches
+    # "remove" parts of the graph without copying any arrays.
+    offsets, targets = graph.offsets, graph.targets
+    dist = {source: 0.0}  # Best known time to each reached node index.
+    parent = {source: -1}  # Edge used to reach each node on the best known path.
+    done = set()
+    heap = [(heuristic(source, target), 0.0, source)]
+    while heap:
+        _, d, u = heapq.heappop(heap)
+        if u in done:
+            continue
+        if u == target:
+            break
+        done.add(u)
+        lo, hi = int(offsets[u]), int(offsets[u + 1])
+        for e, v, w in zip(range(lo, hi), targets[lo:hi].tolist(), cost[lo:hi].tolist()):
+            if v in blocked_nodes or e in blocked_edges:
+                continue
+            nd = d + w
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                parent[v] = e
+                heapq.heappush(heap, (nd + heuristic(v, target), nd, v))
+    stats.count("searches")
+    stats.count("nodes_expanded", len(done))
+
+    if target not in dist:
+        return None, float('inf')
+    return unwind_edges(graph, parent, target), dist[target]
+
+
+def _edge_source(graph, e):
+    # Source node index of edge e (binary search over the CSR offsets).
+    return int(graph.offsets.searchsorted(e, side='right')) - 1
+
+
+def unwind_edges(graph, parent, target):
+    # Edge index list from the search source to target, given the edge each reached
+    # node index was entered by (-1 at the source).
+    edges = []
+    u = target
+    while parent[u] != -1:
+        e = parent[u]
+        edges.append(e)
+        u = _edge_source(graph, e)
+    edges.reverse()
+    return edges
+
+
+def edges_to_path(graph, source, edges):
+    # Node id path of an edge index list starting at node index source.
+    return graph.node_ids[[source] + graph.targets[edges].tolist()].tolist()
+
+
+def shortest_times(graph, source, weights=None, reverse=False):
+    # Single-source Dijkstra from node index source to every node index; returns a
+    # float array (inf where unreachable). reverse=True gives times *to* source.
+    cost = graph.cost if weights is None else weights
+    if reverse:
+        offsets, neighbours, edges = graph.reverse_arrays()
+        cost = cost[edges]
+    else:
+        offsets, neighbours = graph.offsets, graph.targets
+    # Plain lists: the per-node work is a few scalar operations, which is much faster
+    # on lists than on NumPy slices, and converting them once is O(E).
+    offsets, neighbours, cost = offsets.tolist(), neighbours.tolist(), cost.tolist()
+    inf = float('inf')
+    dist = [inf] * graph.num_nodes
+    dist[source] = 0.0
+    done = [False] * graph.num_nodes
+    heap = [(0.0, source)]
+    expanded = 0
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        expanded += 1
+        for i in range(offsets[u], offsets[u + 1]):
+            v = neighbours[i]
+            nd = d + cost[i]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    stats.count("searches")
+    stats.count("nodes_expanded", expanded)
+    return np.array(dist)
+
+
+def dijkstra(graph, start, end, weights=None):
+    return astar(graph, start, end, zero_heuristic, weights)
+
+
+def path_time(graph, path, weights=None):
+    # Time of a given path of node ids using the cached edge costs.
+    cost = graph.cost if weights is None else weights
+    total_time = 0
+    for i in range(len(path) - 1):
+        e = graph.edge_between(path[i], path[i + 1])
+        if e < 0:
+            return float('inf')  # Consecutive nodes without an edge between them.
+        total_time += cost[e]
+    return float(total_time)
+
+
+def shortest_simple_paths(graph, start, end, weights=None):
+    # Yen's algorithm: lazily yields (path, time) for loopless paths in increasing
+    # time, so the top-k alternatives cost k rounds of searches instead of
+    # materializing every simple path.
+    source, target = graph.index_of(start), graph.index_of(end)
+    if source < 0 or target < 0:
+        return
+    cost = graph.cost if weights is None else weights
+    edges, time = _search(graph, source, target, zero_heuristic, cost)
+    if edges is None:
+        return
+    found = [edges]  # Paths already yielded, as edge index lists.
+    candidates = []  # Heap of (time, tiebreak, edges) not yet yielded.
+    seen = {tuple(edges)}
+    counter = 0
+    while True:
+        yield edges_to_path(graph, source, edges), time
+        nodes = [source] + graph.targets[edges].tolist()
+        root_time = 0.0
+        for i in range(len(edges)):
+            spur = nodes[i]
+            root = edges[:i]
+            # Remove the next edge of every found path sharing this root, and the root
+            # nodes themselves, so the spur search can only produce new loopless paths.
+            blocked_edges = {p[i] for p in found if len(p) > i and p[:i] == root}
+            blocked_nodes = set(nodes[:i])
+            spur_edges, spur_time = _search(graph, spur, target, zero_heuristic, cost,
+                                            blocked_nodes, blocked_edges)
+            if spur_edges is not None:
+                candidate = root + spur_edges
+                key = tuple(candidate)
+                if key not in seen:
+                    seen.add(key)
+                    counter += 1
+                    stats.count("paths_scored")
+                    heapq.heappush(candidates, (root_time + spur_time, counter, candidate))
+            root_time += float(cost[edges[i]])
+        if not candidates:
+            return
+        time, _, edges = heapq.heappop(candidates)
+        found.append(edges)
+
+
+def k_shortest_paths(graph, start, end, k, weights=None):
+    # The k best loopless paths as a {path tuple: time} dict, best first.
+    paths = itertools.islice(shortest_simple_paths(graph, start, end, weights), k)
+    return {tuple(path): time for path, time in paths}
@@ -0,0 +1,63 @@
+# ----------------------
+# Lock-free (Hogwild-style) Q-learning on one shared Q array
+# ----------------------
+# The per-edge Q array lives in multiprocessing.shared_memory. Every worker process
+# attaches to it and runs the batched trainer's updates directly on it without any
+# lock: updates only touch the edges a batch visited, so collisions are rare and a
+# lost update just costs a little learning, as in Hogwild! SGD.
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from batch_trainer import BatchTrainer
+
+
+def _worker(shm_name, num_edges, graph, starts, destinations, episodes, learning_rate,
+            discount_factor, epsilon, seed_sequence):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        q = np.ndarray((num_edges,), dtype=np.float64, buffer=shm.buf)
+        trainer = BatchTrainer(graph, starts, destinations, learning_rate, discount_factor,
+                               epsilon, q=q, rng=np.random.default_rng(seed_sequence))
+        trainer.train(episodes)
+        transitions = trainer.transitions
+        del trainer, q  # Release the views before closing the mapping.
+        return transitions
+    finally:
+        shm.close()
+
+
+def train_shared(graph, starts, destinations, episodes, learning_rate, discount_factor,
+                 epsilon, workers=4, seed=0, q=None):
+    # Train one per-edge Q array with `workers` processes updating it concurrently.
+    # Every worker simulates all the given vehicles for `episodes` episodes.
+    # Returns (q, stats); q starts from the given array (or zeros) and is a private copy.
+    graph.build()
+    num_edges = graph.num_edges
+    shm = shared_memory.SharedMemory(create=True, size=max(num_edges, 1) * 8)
+    try:
+        shared_q = np.ndarray((num_edges,), dtype=np.float64, buffer=shm.buf)
+        shared_q[:] = 0.0 if q is None else q
+        streams = np.random.SeedSequence(seed).spawn(workers)
+        began = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_worker, shm.name, num_edges, graph, starts, destinations,
+                                   episodes, learning_rate, discount_factor, epsilon, stream)
+                       for stream in streams]
+            transitions = sum(future.result() for future in futures)
+        elapsed = time.perf_counter() - began
+        result = shared_q.copy()
+        del shared_q
+    finally:
+        shm.close()
+        shm.unlink()
+    stats = {
+        "workers": workers,
+        "transitions": transitions,
+        "seconds": elapsed,
+        "transitions_per_second": transitions / elapsed if elapsed > 0 else 0.0,
+    }
+    return result, stats
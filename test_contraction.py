@@ -0,0 +1,48 @@
+# ----------------------
+# Contraction hierarchy queries against plain Dijkstra
+# ----------------------
+
+import numpy as np
+import pytest
+
+from contraction import ContractionHierarchy
+from networks import grid_network, random_geometric_network, ring_network
+from routing import dijkstra, path_time
+
+
+@pytest.mark.parametrize("graph", [grid_network(8, 8, seed=1), ring_network(6, 10, seed=2),
+                                   random_geometric_network(150, seed=3)],
+                         ids=["grid", "ring", "geometric"])
+def test_queries_match_dijkstra(graph):
+    hierarchy = ContractionHierarchy(graph)
+    free_flow = graph.free_flow_cost()
+    ids = graph.node_ids.tolist()
+    rng = np.random.default_rng(0)
+    for start, end in rng.choice(ids, (60, 2)).tolist():
+        expected = dijkstra(graph, start, end, free_flow)[1]
+        path, time = hierarchy.query(start, end)
+        if expected == float('inf'):
+            assert path is None
+            continue
+        assert time == pytest.approx(expected)
+        assert path[0] == start and path[-1] == end
+        assert path_time(graph, path, free_flow) == pytest.approx(expected)
+
+
+def test_small_witness_limit_stays_exact():
+    graph = random_geometric_network(120, seed=4)
+    hierarchy = ContractionHierarchy(graph, witness_limit=2)
+    free_flow = graph.free_flow_cost()
+    for start in range(0, 120, 11):
+        for end in range(5, 120, 17):
+            assert hierarchy.query(start, end)[1] == pytest.approx(dijkstra(graph, start, end, free_flow)[1])
+
+
+def test_route_prices_the_path_with_live_costs():
+    graph = grid_network(6, 6)
+    hierarchy = ContractionHierarchy(graph)
+    graph.vehicles[:] = np.arange(graph.num_edges) % 7
+    graph.refresh_costs()
+    path, time = hierarchy.route(0, 35)
+    assert time == pytest.approx(path_time(graph, path))
+    assert hierarchy.query(0, 35)[0] == path
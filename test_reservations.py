@@ -0,0 +1,97 @@
+# ----------------------
+# Intersection reservations against a brute-force interval list
+# ----------------------
+
+import numpy as np
+import pytest
+
+from csr_graph import CSRGraph, INTERSECTION_DELAY
+from event_simulation import EventSimulator
+from intersection_reservations import IntersectionReservations
+
+
+class IntervalList:
+    # Brute force: every booked window of every node in a plain list.
+    def __init__(self):
+        self.windows = {}
+
+    def is_free(self, node, start, end):
+        return all(end <= s or e <= start for s, e in self.windows.get(node, []))
+
+    def earliest_free(self, node, time, length):
+        # The answer is time itself or the end of some window.
+        candidates = [time] + [e for _, e in self.windows.get(node, []) if e > time]
+        return min(t for t in candidates if self.is_free(node, t, t + length))
+
+    def reserve(self, node, start, end):
+        self.windows.setdefault(node, []).append((start, end))
+
+    def forget_before(self, node, time):
+        self.windows[node] = [(s, e) for s, e in self.windows.get(node, []) if e > time]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_interval_list(seed):
+    rng = np.random.default_rng(seed)
+    reservations, brute = IntersectionReservations(), IntervalList()
+    clock = 0.0
+    for _ in range(600):
+        node = int(rng.integers(0, 3))
+        # Integer times so back-to-back windows (which get merged) are common. Requests
+        # never start before the clock, like in the simulator.
+        start = clock + float(rng.integers(0, 60))
+        length = float(rng.integers(1, 6))
+        action = rng.random()
+        if action < 0.05:
+            clock += float(rng.integers(0, 10))
+            for other in range(3):
+                reservations.forget_before(other, clock)
+                brute.forget_before(other, clock)
+            continue
+        assert reservations.is_free(node, start, start + length) == brute.is_free(node, start, start + length)
+        free = reservations.earliest_free(node, start, length)
+        assert free == brute.earliest_free(node, start, length)
+        if action < 0.6:
+            reservations.reserve(node, free, free + length)
+            brute.reserve(node, free, free + length)
+        elif not brute.is_free(node, start, start + length):
+            with pytest.raises(ValueError):
+                reservations.reserve(node, start, start + length)
+    for node in range(3):
+        booked = reservations.bookings(node)
+        assert all(e <= s for (_, e), (s, _) in zip(booked, booked[1:]))  # Sorted, disjoint.
+        assert all(e > clock for _, e in booked)
+
+
+class Vehicle:
+    def __init__(self, start, end):
+        self.current_node = start
+        self.destination = end
+        self.time = 0
+
+
+def straight_to(graph, current, destination):
+    return destination if graph.edge_between(current, destination) >= 0 else None
+
+
+def merge_graph():
+    # Two roads meeting at intersection 3.
+    graph = CSRGraph()
+    graph.add_node(1, False)
+    graph.add_node(2, False)
+    graph.add_node(3, True)
+    graph.add_edge(1, 3)
+    graph.add_edge(2, 3)
+    return graph
+
+
+def test_simulator_makes_the_second_vehicle_wait():
+    free = EventSimulator(merge_graph(), straight_to)
+    free.run(arrivals=[Vehicle(1, 3), Vehicle(2, 3)])
+    assert free.total_time == pytest.approx(2 * 4.0)
+
+    reserved = EventSimulator(merge_graph(), straight_to, reservations=IntersectionReservations())
+    reserved.run(arrivals=[Vehicle(1, 3), Vehicle(2, 3)])
+    assert reserved.waiting_time == pytest.approx(INTERSECTION_DELAY)
+    assert reserved.total_time == pytest.approx(2 * 4.0 + INTERSECTION_DELAY)
+    assert reserved.reached == 2
@@ -0,0 +1,98 @@
+# ----------------------
+# Shortest paths, Yen's k shortest paths and A* heuristics against brute force
+# ----------------------
+# Small random networks with random congestion, where every simple path can still be
+# enumerated: dijkstra / k_shortest_paths must find exactly the best times that the old
+# find_all_paths + calculate_path_time approach would have.
+
+import numpy as np
+import pytest
+
+from all_pairs import MatrixHeuristic, travel_time_matrix
+from csr_graph import CSRGraph
+from landmarks import Landmarks
+from networks import grid_network, random_geometric_network
+from routing import astar, dijkstra, k_shortest_paths, path_time, search_edges, shortest_times
+
+
+def random_graph(seed, nodes=9, edges=22):
+    rng = np.random.default_rng(seed)
+    graph = CSRGraph()
+    for i in range(nodes):
+        graph.add_node(i, bool(rng.random() < 0.3))
+    for start, end in rng.integers(0, nodes, (edges, 2)).tolist():
+        if start != end:
+            graph.add_edge(start, end)
+    graph.build()
+    graph.vehicles[:] = rng.integers(0, 40, graph.num_edges)
+    graph.refresh_costs()
+    return graph
+
+
+def all_simple_paths(graph, start, end, path=()):
+    path = path + (start,)
+    if start == end:
+        return [path]
+    return [found for node in graph.nodes[start].edges if node not in path
+            for found in all_simple_paths(graph, node, end, path)]
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_dijkstra_matches_enumeration(seed):
+    graph = random_graph(seed)
+    for start in range(graph.num_nodes):
+        for end in range(graph.num_nodes):
+            times = [path_time(graph, path) for path in all_simple_paths(graph, start, end)]
+            path, time = dijkstra(graph, start, end)
+            if not times:
+                assert path is None and time == float('inf')
+                continue
+            assert time == pytest.approx(min(times))
+            assert path_time(graph, path) == pytest.approx(time)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_k_shortest_paths_match_enumeration(seed):
+    graph = random_graph(seed)
+    for start, end in [(0, 5), (1, 8), (3, 2), (7, 4)]:
+        expected = sorted(path_time(graph, path) for path in all_simple_paths(graph, start, end))
+        found = k_shortest_paths(graph, start, end, 6)
+        assert [time for time in found.values()] == pytest.approx(expected[:6])
+        for path, time in found.items():
+            assert len(set(path)) == len(path)  # Loopless.
+            assert path[0] == start and path[-1] == end
+            assert path_time(graph, path) == pytest.approx(time)
+
+
+def test_shortest_times_match_dijkstra():
+    graph = random_geometric_network(120, seed=3)
+    for source in (0, 17, 64):
+        forward = shortest_times(graph, source)
+        backward = shortest_times(graph, source, reverse=True)
+        for other in range(0, 120, 7):
+            assert forward[other] == pytest.approx(dijkstra(graph, source, other)[1])
+            assert backward[other] == pytest.approx(dijkstra(graph, other, source)[1])
+
+
+def test_search_edges_returns_the_dijkstra_path():
+    graph = grid_network(6, 6)
+    edges, time = search_edges(graph, graph.index_of(0), graph.index_of(35))
+    assert float(graph.cost[edges].sum()) == pytest.approx(time)
+    assert time == pytest.approx(dijkstra(graph, 0, 35)[1])
+    assert search_edges(graph, graph.index_of(35), graph.index_of(35)) == ([], 0.0)
+
+
+def test_landmark_and_matrix_heuristics_keep_astar_exact():
+    graph = random_geometric_network(200, seed=5)
+    rng = np.random.default_rng(5)
+    graph.vehicles[:] = rng.integers(0, 50, graph.num_edges)
+    graph.refresh_costs()  # Congestion only adds time, so free-flow bounds stay admissible.
+    landmarks = Landmarks(graph, count=4)
+    goals = [7, 99, 150]
+    times, indices = travel_time_matrix(graph, goals, weights=graph.free_flow_cost(), workers=1)
+    matrix = MatrixHeuristic(times, indices)
+    for start in range(0, 200, 13):
+        for goal in goals:
+            expected = dijkstra(graph, start, goal)[1]
+            assert astar(graph, start, goal, landmarks)[1] == pytest.approx(expected)
+            assert astar(graph, start, goal, matrix)[1] == pytest.approx(expected)
@@ -0,0 +1,71 @@
+# ----------------------
+# Frank-Wolfe assignment and best-response coordination against known equilibria
+# ----------------------
+# Two-route network: a direct road 1 -> 4 (cost 1 + 0.01 x) and a detour 1 -> 2 -> 4
+# (two edges, cost 2 + 0.02 x) shared by 200 vehicles. Setting the route costs equal
+# gives the user equilibrium 166.67 / 33.33; setting the marginal costs
+# (1 + 0.02 x and 2 + 0.04 x) equal gives the system optimum 150 / 50.
+
+import numpy as np
+import pytest
+
+from best_response import best_response_routing
+from csr_graph import CONGESTION_FACTOR, CSRGraph
+from networks import grid_network, random_demand
+from routing import search_edges
+from traffic_assignment import frank_wolfe
+
+
+def two_routes():
+    graph = CSRGraph()
+    for node in (1, 2, 4):
+        graph.add_node(node, False)
+    graph.add_edge(1, 4)
+    graph.add_edge(1, 2)
+    graph.add_edge(2, 4)
+    return graph.build()
+
+
+def test_user_equilibrium_split():
+    graph = two_routes()
+    assignment = frank_wolfe(graph, [(1, 4, 200)], "ue")
+    direct, detour = assignment.flows[graph.edge_between(1, 4)], assignment.flows[graph.edge_between(1, 2)]
+    assert direct == pytest.approx(500 / 3, abs=1e-3)
+    assert detour == pytest.approx(100 / 3, abs=1e-3)
+    # Both used routes take the same time.
+    assert assignment.cost[graph.edge_between(1, 4)] == pytest.approx(
+        assignment.cost[graph.edge_between(1, 2)] + assignment.cost[graph.edge_between(2, 4)])
+
+
+def test_system_optimum_split():
+    graph = two_routes()
+    optimum = frank_wolfe(graph, [(1, 4, 200)], "so")
+    assert optimum.flows[graph.edge_between(1, 4)] == pytest.approx(150, abs=1e-3)
+    assert optimum.flows[graph.edge_between(1, 2)] == pytest.approx(50, abs=1e-3)
+    assert optimum.total_time <= frank_wolfe(graph, [(1, 4, 200)], "ue").total_time
+
+
+def test_unknown_nodes_are_rejected():
+    with pytest.raises(KeyError):
+        frank_wolfe(two_routes(), [(1, 99)])
+
+
+def test_best_response_reaches_an_equilibrium():
+    graph = grid_network(12, 12)
+    trips = random_demand(graph, 60, seed=4)
+    coordination = best_response_routing(graph, trips)
+    assert coordination.converged
+
+    # Rebuild everyone's loads and check that no vehicle can switch to a faster route.
+    free_flow = graph.free_flow_cost()
+    loads = np.zeros(graph.num_edges)
+    routes = [[graph.edge_between(u, w) for u, w in zip(path, path[1:])] for path in coordination.routes]
+    for edges in routes:
+        np.add.at(loads, edges, 1)
+    for (start, end), edges, time in zip(trips, routes, coordination.times):
+        others = loads.copy()
+        np.add.at(others, edges, -1)
+        weights = free_flow + CONGESTION_FACTOR * others
+        assert time == pytest.approx(float(weights[edges].sum()))
+        _, best = search_edges(graph, graph.index_of(start), graph.index_of(end), weights)
+        assert time <= best + 1e-9
@@ -0,0 +1,125 @@
+# ----------------------
+# Time-expanded congestion: per-edge occupancy over discrete time slots
+# ----------------------
+# Instead of one vehicles counter per edge that every call mutates, occupancy[e, s] is
+# the number of vehicles booked on edge e during time slot s (slot s covers
+# [s * slot_width, (s + 1) * slot_width)). A vehicle books an edge for the interval it
+# actually drives on it, as one vectorized range increment, and the cost of an edge is
+# read at the time a vehicle would enter it:
+#   cost(e, t) = BASE_TIME + CONGESTION_FACTOR * occupancy[e, slot(t)] + intersection delay
+# so vehicles are only slowed by others that are on the same edge at the same time.
+# The slot axis grows on demand; times past the horizon see an empty network.
+
+import heapq
+
+import numpy as np
+
+from csr_graph import CONGESTION_FACTOR
+from routing import edges_to_path, unwind_edges
+
+
+class TimeExpandedCongestion:
+    def __init__(self, graph, slot_width=1.0, horizon=256):
+        # horizon is the initial number of slots; it doubles whenever a booking ends
+        # past it.
+        self.graph = graph.build()
+        self.slot_width = slot_width
+        self.occupancy = np.zeros((graph.num_edges, horizon), dtype=np.int32)
+        self.free_flow = graph.free_flow_cost()
+
+    @property
+    def horizon(self):
+        return self.occupancy.shape[1]
+
+    def _grow(self, slots):
+        if slots > self.horizon:
+            grown = np.zeros((self.occupancy.shape[0], max(slots, 2 * self.horizon)), dtype=np.int32)
+            grown[:, :self.horizon] = self.occupancy
+            self.occupancy = grown
+
+    def _slots(self, enter, exit):
+        # Slot range [first, last) covered by driving from enter to exit (at least one).
+        first = np.floor(np.asarray(enter) / self.slot_width).astype(np.int64)
+        last = np.maximum(np.ceil(np.asarray(exit) / self.slot_width).astype(np.int64), first + 1)
+        return first, last
+
+    # --- Costs at a given time ---
+
+    def vehicles_at(self, edges, times):
+        slots = np.floor(np.asarray(times) / self.slot_width).astype(np.int64)
+        inside = slots < self.horizon
+        return np.where(inside, self.occupancy[edges, np.where(inside, slots, 0)], 0)
+
+    def cost_at(self, edges, times):
+        # Travel time of each edge for a vehicle entering it at the matching time.
+        return self.free_flow[edges] + CONGESTION_FACTOR * self.vehicles_at(edges, times)
+
+    # --- Bookings ---
+
+    def book(self, e, enter, exit, count=1):
+        # One vehicle (or count of them) on edge e from enter until exit.
+        first, last = self._slots(enter, exit)
+        self._grow(int(last))
+        self.occupancy[e, first:last] += count
+
+    def book_many(self, edges, enters, exits, count=1):
+        # Many traversals at once: a difference array over the touched edges, summed
+        # along the slot axis, instead of one slice update per traversal.
+        edges = np.asarray(edges, dtype=np.int64)
+        if len(edges) == 0:
+            return
+        first, last = self._slots(enters, exits)
+        self._grow(int(last.max()))
+        touched, row = np.unique(edges, return_inverse=True)
+        diff = np.zeros((len(touched), self.horizon + 1), dtype=np.int32)
+        np.add.at(diff, (row, first), count)
+        np.add.at(diff, (row, last), -count)
+        self.occupancy[touched] += np.cumsum(diff[:, :-1], axis=1, dtype=np.int32)
+
+    def book_route(self, edges, depart_time=0.0):
+        # Drive a list of edge indices starting at depart_time, book every traversal
+        # and return the arrival time. Each edge costs what it costs when entered.
+        enters, exits = [], []
+        t = depart_time
+        for e in edges:
+            enters.append(t)
+            t += float(self.cost_at(e, t))
+            exits.append(t)
+        self.book_many(edges, enters, exits)
+        return t
+
+    # --- Time-dependent routing ---
+
+    def route(self, start, end, depart_time=0.0):
+        # Earliest-arrival path between two node ids for a vehicle leaving at
+        # depart_time; returns (path ids, edge indices, travel time) or (None, None, inf).
+        graph = self.graph
+        source, target = graph.index_of(start), graph.index_of(end)
+        if source < 0 or target < 0:
+            return None, None, float('inf')
+        offsets, targets = graph.offsets, graph.targets
+        arrival = {source: depart_time}
+        parent = {source: -1}
+        done = set()
+        heap = [(depart_time, source)]
+        while heap:
+            t, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            if u == target:
+                break
+            done.add(u)
+            lo, hi = int(offsets[u]), int(offsets[u + 1])
+            if lo == hi:
+                continue
+            edges = np.arange(lo, hi)
+            times = (t + self.cost_at(edges, np.full(hi - lo, t))).tolist()
+            for e, v, tv in zip(range(lo, hi), targets[lo:hi].tolist(), times):
+                if tv < arrival.get(v, float('inf')):
+                    arrival[v] = tv
+                    parent[v] = e
+                    heapq.heappush(heap, (tv, v))
+        if target not in arrival:
+            return None, None, float('inf')
+        edges = unwind_edges(graph, parent, target)
+        return edges_to_path(graph, source, edges), edges, arrival[target] - depart_time
@@ -0,0 +1,87 @@
+# ----------------------
+# Leveled structured tracing for the solvers
+# ----------------------
+# Hot paths guard every event with a plain integer comparison,
+#   if tracing.level >= tracing.DEBUG:
+#       tracing.emit("hop", vehicle=..., start=..., end=..., time=...)
+# so with tracing off (the default) nothing is formatted or written. When enabled,
+# events are JSON objects ({"t": seconds since start, "event": kind, ...fields}) kept
+# in a buffer and written one per line to the trace file in large batches. Infinite or
+# NaN floats (e.g. the time of an unreachable trip) are written as the strings "inf",
+# "-inf" and "nan", so every line stays strict JSON.
+# Tracing can be switched on without touching the code through the environment:
+#   TRAFFIC_TRACE=run.jsonl TRAFFIC_TRACE_LEVEL=debug python QLearning.py
+
+import atexit
+import json
+import math
+import os
+import time
+
+OFF = 0
+INFO = 1  # One event per vehicle: path choices, arrivals, results.
+DEBUG = 2  # One event per hop: moves, travel times, Q-updates.
+LEVELS = {"off": OFF, "info": INFO, "debug": DEBUG}
+
+level = OFF
+_file = None
+_buffer = []
+_buffer_size = 10000
+_started = time.perf_counter()
+
+
+def configure(path, trace_level=INFO, buffer_size=10000):
+    # Start writing events at or below trace_level to path (appending). A level name
+    # ("info", "debug") is accepted as well as the constants.
+    global level, _file, _buffer_size
+    close()
+    if isinstance(trace_level, str):
+        trace_level = LEVELS[trace_level.lower()]
+    if path is None or trace_level == OFF:
+        return
+    _file = open(path, "a")
+    _buffer_size = buffer_size
+    level = trace_level
+
+
+def emit(event, **fields):
+    # Record one event; callers check tracing.level first so disabled tracing is free.
+    fields["t"] = round(time.perf_counter() - _started, 6)
+    fields["event"] = event
+    _buffer.append(fields)
+    if len(_buffer) >= _buffer_size:
+        flush()
+
+
+def flush():
+    if _file is not None and _buffer:
+        _file.write("".join(json.dumps(_finite(fields), default=str, allow_nan=False) + "\n"
+                            for fields in _buffer))
+        _file.flush()
+    _buffer.clear()
+
+
+def _finite(value):
+    # Copy of value with every non-finite float replaced by its string form.
+    if isinstance(value, float):
+        return value if math.isfinite(value) else str(value)
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def close():
+    global level, _file
+    flush()
+    if _file is not None:
+        _file.close()
+    _file = None
+    level = OFF
+
+
+atexit.register(close)
+
+if os.environ.get("TRAFFIC_TRACE"):
+    configure(os.environ["TRAFFIC_TRACE"], os.environ.get("TRAFFIC_TRACE_LEVEL", "info"))
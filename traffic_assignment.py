@@ -0,0 +1,107 @@
+# ----------------------
+# Static traffic assignment with the Frank-Wolfe algorithm
+# ----------------------
+# Routes every origin-destination demand at once instead of vehicle by vehicle. Edge
+# cost is the usual linear congestion model applied to the edge's flow x:
+#   t(x) = BASE_TIME + intersection delay + CONGESTION_FACTOR * x
+# Each iteration loads all demand onto the shortest paths under the current costs
+# (all-or-nothing, one shortest-path tree per origin) and moves the flows towards that
+# load by the step that minimises the objective exactly (closed form, because costs are
+# linear). objective="ue" gives the user equilibrium (no driver can switch to a faster
+# path); objective="so" the system optimum (least total travel time), found by running
+# the same iteration on marginal costs t(x) + x * t'(x).
+# The relative gap (how far the current flows are from the best response) is recorded
+# every iteration and is the stopping criterion.
+
+import numpy as np
+
+from csr_graph import CONGESTION_FACTOR
+from routing import shortest_times
+
+
+class Assignment:
+    def __init__(self, graph, flows, objective, gaps):
+        self.graph = graph
+        self.flows = flows  # Vehicles on each edge.
+        self.objective = objective
+        self.gaps = gaps  # Relative gap after each iteration.
+        free_flow = graph.free_flow_cost()
+        self.cost = free_flow + CONGESTION_FACTOR * flows  # Travel time of each edge.
+
+    @property
+    def iterations(self):
+        return len(self.gaps)
+
+    @property
+    def total_time(self):
+        # Total travel time of all vehicles.
+        return float(np.dot(self.flows, self.cost))
+
+
+def _group_demand(graph, demand):
+    # (origin index, destination index, vehicles) arrays, duplicates summed.
+    demand = list(demand)
+    origins = graph._lookup([trip[0] for trip in demand])
+    destinations = graph._lookup([trip[1] for trip in demand])
+    if (origins < 0).any() or (destinations < 0).any():
+        raise KeyError("origin or destination node not in graph")
+    vehicles = np.array([trip[2] if len(trip) > 2 else 1 for trip in demand], dtype=np.float64)
+    return origins, destinations, vehicles
+
+
+def all_or_nothing(graph, origins, destinations, vehicles, weights):
+    # Edge flows when every trip takes its shortest path under fixed weights. One
+    # shortest-path tree per distinct origin carries all of that origin's trips.
+    sources, targets = graph.edge_sources(), graph.targets
+    flows = np.zeros(graph.num_edges)
+    order = np.argsort(origins, kind="stable")
+    origins, destinations, vehicles = origins[order], destinations[order], vehicles[order]
+    starts = np.flatnonzero(np.r_[True, origins[1:] != origins[:-1]])
+    for lo, hi in zip(starts, np.r_[starts[1:], len(origins)]):
+        origin = int(origins[lo])
+        dist = shortest_times(graph, origin, weights)
+        # Tree edge into every reached node: the first edge that is tight under dist.
+        tight = np.flatnonzero(np.isfinite(dist[sources]) & np.isclose(dist[sources] + weights, dist[targets]))
+        parent = np.full(graph.num_nodes, -1, dtype=np.int64)
+        parent[targets[tight[::-1]]] = tight[::-1]
+        parent[origin] = -1
+        load = np.bincount(destinations[lo:hi], weights=vehicles[lo:hi], minlength=graph.num_nodes)
+        # Push each node's load up the tree, farthest nodes first.
+        reached = np.flatnonzero(np.isfinite(dist) & (parent >= 0))
+        load_list = load.tolist()
+        parent_list, source_list = parent.tolist(), sources.tolist()
+        for v in reached[np.argsort(-dist[reached], kind="stable")].tolist():
+            if load_list[v]:
+                e = parent_list[v]
+                flows[e] += load_list[v]
+                load_list[source_list[e]] += load_list[v]
+    return flows
+
+
+def frank_wolfe(graph, demand, objective="ue", max_iterations=50, tolerance=1e-4):
+    # demand is an iterable of (origin id, destination id) or (origin, destination,
+    # vehicles) trips; returns an Assignment with the edge flows.
+    if objective not in ("ue", "so"):
+        raise ValueError(f"unknown objective {objective!r}")
+    graph.build()
+    origins, destinations, vehicles = _group_demand(graph, demand)
+    free_flow = graph.free_flow_cost()
+    # Slope of the cost the iteration works with: t'(x) for UE, 2 t'(x) for marginal cost.
+    slope = CONGESTION_FACTOR if objective == "ue" else 2 * CONGESTION_FACTOR
+
+    flows = all_or_nothing(graph, origins, destinations, vehicles, free_flow)
+    gaps = []
+    for _ in range(max_iterations):
+        cost = free_flow + slope * flows
+        target = all_or_nothing(graph, origins, destinations, vehicles, cost)
+        current = float(np.dot(cost, flows))
+        gap = (current - float(np.dot(cost, target))) / current if current > 0 else 0.0
+        gaps.append(gap)
+        if gap <= tolerance:
+            break
+        # Exact line search: the objective's derivative along d is linear in the step.
+        direction = target - flows
+        curvature = slope * float(np.dot(direction, direction))
+        step = 1.0 if curvature == 0 else min(max(-float(np.dot(cost, direction)) / curvature, 0.0), 1.0)
+        flows = flows + step * direction
+    return Assignment(graph, flows, objective, gaps)